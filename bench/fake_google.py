@@ -0,0 +1,146 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+# Usage: python bench/fake_google.py [--latency 500] [--refresh-interval 1]
+# Local stand-ins for the GA4 Data API client and the Search Console service,
+# installed with google_services.set_clients(). Each call sleeps for the given
+# latency, like the real APIs. Run as a script, it checks the dashboard's Google
+# widgets against them: the first read returns the loading placeholder without
+# waiting, the background refresher fills in the numbers, and every refresh
+# goes through the same client objects.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeGA4Client:
+    """
+    BetaAnalyticsDataClient stand-in: run_report() answers activeUsers and totalUsers.
+    """
+
+    def __init__(self, latency=0.5, active_users=1234, total_users=5678):
+        self.latency = latency
+        self.active_users = active_users
+        self.total_users = total_users
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def run_report(self, request=None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        values = [SimpleNamespace(value=str(self.active_users)), SimpleNamespace(value=str(self.total_users))]
+        return SimpleNamespace(rows=[SimpleNamespace(metric_values=values)])
+
+
+class FakeSearchConsole:
+    """
+    Search Console service stand-in: searchanalytics().query(...).execute() answers one row per day.
+    """
+
+    def __init__(self, latency=0.5, clicks_per_day=40, impressions_per_day=900):
+        self.latency = latency
+        self.clicks_per_day = clicks_per_day
+        self.impressions_per_day = impressions_per_day
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def searchanalytics(self):
+        return self
+
+    def query(self, siteUrl, body):
+        return SimpleNamespace(execute=lambda: self._execute(body))
+
+    def _execute(self, body):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency)
+        start = datetime.strptime(body['startDate'], '%Y-%m-%d')
+        end = datetime.strptime(body['endDate'], '%Y-%m-%d')
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)][:body.get('rowLimit', 1000)]
+        return {"rows": [
+            {"keys": [day.strftime('%Y-%m-%d')], "clicks": self.clicks_per_day, "impressions": self.impressions_per_day}
+            for day in days
+        ]}
+
+
+def install(latency=0.5):
+    """
+    Points google_services at new stand-ins and returns them as (ga4, gsc).
+    """
+    from dashboard_app import google_services
+    ga4, gsc = FakeGA4Client(latency), FakeSearchConsole(latency)
+    google_services.set_clients(ga4_client=ga4, gsc_service=gsc)
+    return ga4, gsc
+
+
+def wait_until(condition, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the Google widgets against local stand-ins")
+    parser.add_argument('--latency', type=float, default=500, help="Stand-in latency per call (ms)")
+    parser.add_argument('--refresh-interval', type=int, default=1, help="GOOGLE_REFRESH_INTERVAL (s)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='omaya-google-')
+    os.environ.update(
+        GOOGLE_REFRESH_INTERVAL=str(args.refresh_interval),
+        MIRROR_SYNC_INTERVAL='0',
+        MIRROR_DB_PATH=os.path.join(workdir, 'mirror.sqlite3'),
+        WC_CACHE_PATH=os.path.join(workdir, 'cache.sqlite3'),
+        METRICS_DIR=os.path.join(workdir, 'metrics'),
+    )
+    sys.path.insert(0, ROOT)
+    from dashboard_app import google_services
+    from dashboard_app.app import app
+
+    latency = args.latency / 1000
+    ga4, gsc = install(latency)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['logged_in'] = True
+
+    failures = []
+
+    def check(ok, message):
+        print(f"{'ok  ' if ok else 'FAIL'} {message}")
+        if not ok:
+            failures.append(message)
+
+    started = time.perf_counter()
+    first = client.get('/api/widgets/ga4').get_json()
+    elapsed = time.perf_counter() - started
+    check(first.get('status') == 'loading' and elapsed < latency,
+          f"first read returns the placeholder in {elapsed * 1000:.0f} ms (stand-in latency {args.latency:.0f} ms)")
+
+    live = wait_until(lambda: client.get('/api/widgets/gsc').get_json().get('status') == 'live', latency * 4 + 5)
+    ga4_data = client.get('/api/widgets/ga4').get_json()
+    gsc_data = client.get('/api/widgets/gsc').get_json()
+    check(live and ga4_data.get('active_users') == str(ga4.active_users),
+          f"background refresh fills in GA4: {ga4_data}")
+    check(live and gsc_data.get('clicks') == gsc.clicks_per_day * 31,
+          f"background refresh fills in Search Console: {gsc_data}")
+
+    refreshed = wait_until(lambda: ga4.calls >= 2 and gsc.calls >= 2, (latency * 2 + args.refresh_interval) * 2 + 5)
+    check(refreshed and google_services._ga4_client is ga4 and google_services._gsc_service is gsc,
+          f"refreshes reuse the same clients ({ga4.calls} GA4 and {gsc.calls} Search Console calls)")
+
+    shutil.rmtree(workdir, ignore_errors=True)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Usage: python bench/fake_woocommerce.py [--port 8900] [--latency 120] [--orders 2000] ...
+# A local stand-in for the WooCommerce REST API (wc/v3) used by the benchmark.
+# GET /__stats returns {"requests": N}; POST /__reset sets it back to 0.
+# Writes: POST <resource>/batch (updates only) and orders/<id>/notes.
+
+API_PREFIX = "/wp-json/wc/v3/"
+STATUSES = ["completed", "processing", "on-hold", "pending", "cancelled", "refunded"]
+CATEGORIES = [(15, "Cakes"), (16, "Pastries"), (17, "Ramadan"), (18, "Waffles & Crepes"), (19, "Gifts")]
+FIRST_NAMES = ["Ahmad", "Lina", "Omar", "Sara", "Yousef", "Maya", "Khaled", "Rania", "Sami", "Nour"]
+LAST_NAMES = ["Haddad", "Khoury", "Nasser", "Saleh", "Aziz", "Mansour", "Darwish", "Halabi"]
+
+
+def _date(rng, now, days):
+    return (now - timedelta(seconds=rng.randint(0, days * 86400))).strftime('%Y-%m-%dT%H:%M:%S')
+
+
+def make_store(products=300, orders=2000, customers=800, coupons=20, seed=1):
+    """
+    Deterministic catalogue of records shaped like the WooCommerce REST responses.
+    """
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1)
+    store = {"products": [], "orders": [], "customers": [], "coupons": []}
+
+    for i in range(1, products + 1):
+        category = rng.choice(CATEGORIES)
+        created = _date(rng, now, 720)
+        store["products"].append({
+            "id": i,
+            "name": f"Product {i} {category[1]}",
+            "slug": f"product-{i}",
+            "status": "publish",
+            "price": str(rng.randint(5, 400)),
+            "regular_price": str(rng.randint(5, 400)),
+            "stock_status": rng.choice(["instock", "instock", "instock", "outofstock"]),
+            "categories": [{"id": category[0], "name": category[1], "slug": category[1].lower()}],
+            "images": [{"id": i, "src": f"/wp-content/uploads/product-{i}-larg.jpg", "alt": ""}],
+            "description": "<p>" + "Fresh from the oven. " * rng.randint(5, 40) + "</p>",
+            "date_created": created,
+            "date_modified_gmt": created,
+        })
+
+    for i in range(1, customers + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created = _date(rng, now, 720)
+        store["customers"].append({
+            "id": i,
+            "first_name": first,
+            "last_name": last,
+            "email": f"{first.lower()}.{last.lower()}{i}@example.com",
+            "role": "customer",
+            "orders_count": rng.randint(0, 30),
+            "total_spent": f"{rng.uniform(0, 5000):.2f}",
+            "billing": {"first_name": first, "last_name": last, "country": rng.choice(["SA", "AE", "JO", "SY"])},
+            "date_created": created,
+            "date_modified_gmt": created,
+        })
+
+    for i in range(1, orders + 1):
+        customer = rng.choice(store["customers"]) if store["customers"] else {"billing": {}}
+        items = []
+        for _ in range(rng.randint(1, 4)):
+            product = rng.choice(store["products"])
+            quantity = rng.randint(1, 3)
+            items.append({
+                "id": len(items) + 1,
+                "product_id": product["id"],
+                "name": product["name"],
+                "quantity": quantity,
+                "total": f"{float(product['price']) * quantity:.2f}",
+            })
+        created = _date(rng, now, 365)
+        store["orders"].append({
+            "id": i,
+            "status": rng.choice(STATUSES),
+            "currency": "SAR",
+            "total": f"{sum(float(item['total']) for item in items):.2f}",
+            "billing": dict(customer["billing"], email=customer.get("email", "")),
+            "line_items": items,
+            "date_created": created,
+            "date_modified_gmt": created,
+        })
+
+    for i in range(1, coupons + 1):
+        store["coupons"].append({
+            "id": i,
+            "code": f"SAVE{i * 5}",
+            "amount": str(i * 5),
+            "discount_type": "percent",
+            "usage_count": rng.randint(0, 200),
+            "date_expires": None,
+            "date_created": _date(rng, now, 365),
+        })
+
+    # Newest first, like the default orderby=date
+    for records in store.values():
+        records.sort(key=lambda r: r["date_created"], reverse=True)
+    return store
+
+
+class FakeWooCommerce(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, store, latency=0.0, jitter=0.0):
+        super().__init__(address, Handler)
+        self.store = store
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like a real store behind nginx
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        url = urlparse(self.path)
+        if url.path == "/__reset":
+            with self.server.lock:
+                self.server.requests = 0
+            return self._send(200, {"requests": 0})
+        if not url.path.startswith(API_PREFIX):
+            return self._send(404, {"code": "rest_no_route"})
+
+        with self.server.lock:
+            self.server.requests += 1
+        if self.server.latency:
+            time.sleep(max(0.0, self.server.latency + random.uniform(-self.server.jitter, self.server.jitter)))
+
+        endpoint = url.path[len(API_PREFIX):].strip('/')
+        data = json.loads(body or b'{}')
+        resource, _, rest = endpoint.partition('/')
+        records = self.server.store.get(resource)
+        if records is None:
+            return self._send(404, {"code": "rest_no_route"})
+        by_id = {r["id"]: r for r in records}
+
+        if rest == "batch":
+            updates = data.get("update") or []
+            if len(updates) + len(data.get("create") or []) + len(data.get("delete") or []) > 100:
+                return self._send(413, {"code": "rest_request_entity_too_large", "message": "Unable to accept more than 100 items for this request."})
+            updated = []
+            for update in updates:
+                record = by_id.get(update.get("id"))
+                if record is None:
+                    updated.append({"id": update.get("id"), "error": {"code": "woocommerce_rest_shop_order_invalid_id", "message": "Invalid ID.", "data": {"status": 400}}})
+                    continue
+                record.update({k: v for k, v in update.items() if k != "id"})
+                record["date_modified_gmt"] = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S')
+                updated.append(record)
+            return self._send(200, {"update": updated})
+
+        record_id, _, sub = rest.partition('/')
+        if sub == "notes" and record_id.isdigit():
+            if int(record_id) not in by_id:
+                return self._send(404, {"code": "woocommerce_rest_shop_order_invalid_id", "message": "Invalid ID."})
+            return self._send(201, {"id": random.randint(1, 10 ** 6), "note": data.get("note"), "customer_note": bool(data.get("customer_note"))})
+        self._send(405, {"code": "rest_no_route"})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/__stats":
+            return self._send(200, {"requests": self.server.requests})
+        if not url.path.startswith(API_PREFIX):
+            return self._send(404, {"code": "rest_no_route"})
+
+        with self.server.lock:
+            self.server.requests += 1
+        if self.server.latency:
+            time.sleep(max(0.0, self.server.latency + random.uniform(-self.server.jitter, self.server.jitter)))
+
+        endpoint = url.path[len(API_PREFIX):].strip('/')
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        if endpoint == "reports/sales":
+            paid = [o for o in self.server.store["orders"] if o["status"] in ("completed", "processing", "on-hold")]
+            return self._send(200, [{"total_sales": f"{sum(float(o['total']) for o in paid):.2f}"}])
+
+        resource, _, record_id = endpoint.partition('/')
+        records = self.server.store.get(resource)
+        if records is None:
+            return self._send(404, {"code": "rest_no_route"})
+        if record_id:
+            match = next((r for r in records if str(r["id"]) == record_id), None)
+            return self._send(200, match) if match else self._send(404, {"code": "not_found"})
+
+        if params.get("status") and params["status"] != "any":
+            records = [r for r in records if r.get("status") == params["status"]]
+        if params.get("search"):
+            term = params["search"].lower()
+            records = [r for r in records if term in json.dumps(r).lower()]
+        if params.get("orderby") == "id":
+            records = sorted(records, key=lambda r: r["id"], reverse=params.get("order") != "asc")
+
+        per_page = min(int(params.get("per_page", 10)), 100)
+        page = max(int(params.get("page", 1)), 1)
+        total = len(records)
+        body = records[(page - 1) * per_page:page * per_page]
+        if params.get("_fields"):
+            fields = params["_fields"].split(',')
+            body = [{k: r[k] for k in fields if k in r} for r in body]
+        self._send(200, body, {
+            "X-WP-Total": str(total),
+            "X-WP-TotalPages": str(max(1, -(-total // per_page))),
+        })
+
+
+def serve(port=0, latency_ms=0, jitter_ms=0, products=300, orders=2000, customers=800, seed=1):
+    """
+    Starts the fake store on a background thread and returns the server (server.server_port).
+    """
+    server = FakeWooCommerce(
+        ('127.0.0.1', port),
+        make_store(products=products, orders=orders, customers=customers, seed=seed),
+        latency=latency_ms / 1000.0,
+        jitter=jitter_ms / 1000.0,
+    )
+    threading.Thread(target=server.serve_forever, name='fake-woocommerce', daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local WooCommerce REST stand-in")
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency', type=float, default=120, help="Added latency per call (ms)")
+    parser.add_argument('--jitter', type=float, default=30, help="+/- random latency (ms)")
+    parser.add_argument('--products', type=int, default=300)
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--customers', type=int, default=800)
+    args = parser.parse_args()
+
+    server = serve(args.port, args.latency, args.jitter, args.products, args.orders, args.customers)
+    print(f"Fake WooCommerce on http://127.0.0.1:{server.server_port} (latency {args.latency}ms)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
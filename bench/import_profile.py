@@ -0,0 +1,108 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Usage: python bench/import_profile.py [--runs 5] [--budget-ms 300] [--save-baseline]
+# Imports the app in fresh interpreters with `python -X importtime` (what a serverless
+# cold start pays before the first request) and prints the median total import time and
+# the packages and modules that dominate it. Compares with bench/import_baseline.json and
+# exits with status 1 when the total is over --budget-ms, so CI can keep cold starts low.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'import_baseline.json')
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$')
+
+
+def profile_once(module, workdir):
+    """
+    {"total_us", "packages": {top-level package: self us}, "modules": {module: cumulative us}}
+    for one fresh import of `module`.
+    """
+    env = dict(
+        os.environ,
+        PYTHONPATH=ROOT,
+        MIRROR_SYNC_INTERVAL='0',
+        MIRROR_DB_PATH=os.path.join(workdir, 'mirror.sqlite3'),
+        WC_CACHE_PATH=os.path.join(workdir, 'cache.sqlite3'),
+        METRICS_DIR=os.path.join(workdir, 'metrics'),
+    )
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    packages, modules = {}, {}
+    total = 0
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = int(match[1]), int(match[2]), match[3], match[4]
+        packages[name.split('.')[0]] = packages.get(name.split('.')[0], 0) + self_us
+        modules[name] = cumulative_us
+        if name == module and len(indent) == 1:
+            total = cumulative_us
+    return {"total_us": total, "packages": packages, "modules": modules}
+
+
+def median_of(runs, key):
+    names = set().union(*(run[key] for run in runs))
+    return {name: statistics.median(run[key].get(name, 0) for run in runs) for name in names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import time profile")
+    parser.add_argument('--module', default='dashboard_app.app')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--budget-ms', type=float, help="Fail when the median total is above this")
+    parser.add_argument('--save-baseline', action='store_true', help=f"Write the results to {BASELINE_PATH}")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='omaya-imports-') as workdir:
+        profile_once(args.module, workdir)  # Warm the bytecode and OS file caches
+        runs = [profile_once(args.module, workdir) for _ in range(args.runs)]
+
+    total_ms = statistics.median(run["total_us"] for run in runs) / 1000
+    packages = sorted(median_of(runs, "packages").items(), key=lambda item: -item[1])[:args.top]
+    modules = sorted(median_of(runs, "modules").items(), key=lambda item: -item[1])[:args.top]
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+
+    line = f"import {args.module}: {total_ms:.1f} ms (median of {args.runs}, Python {sys.version.split()[0]})"
+    if baseline.get("total_ms"):
+        line += f"   baseline {baseline['total_ms']} ms ({(total_ms - baseline['total_ms']) / baseline['total_ms'] * 100:+.0f}%)"
+    print(line)
+    print(f"\n{'package (self time)':<40}{'ms':>9}")
+    for name, us in packages:
+        print(f"{name:<40}{us / 1000:>9.1f}")
+    print(f"\n{'module (cumulative)':<60}{'ms':>9}")
+    for name, us in modules:
+        print(f"{name:<60}{us / 1000:>9.1f}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump({
+                "module": args.module,
+                "python": sys.version.split()[0],
+                "total_ms": round(total_ms, 1),
+                "packages": {name: round(us / 1000, 1) for name, us in packages},
+            }, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline saved to {BASELINE_PATH}")
+
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\nOver budget: {total_ms:.1f} ms > {args.budget_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+import argparse
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from fake_woocommerce import serve
+
+# Usage: python bench/run_bench.py [--mirror] [--mode gevent] [--save-baseline] [--requests 200] [--concurrency 16]
+# Starts the fake store and the real gunicorn entry point (dashboard_app.app:app),
+# loads each dashboard route concurrently and prints latency percentiles, throughput
+# and upstream (fake store) calls per request. Compares with bench/baseline.json.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+ROUTES = ['/', '/products', '/orders', '/customers', '/marketing', '/api/stats']
+ADMIN_USER = 'bench'
+ADMIN_PASS = 'bench'
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def upstream_calls(store_url):
+    return requests.get(f"{store_url}/__stats", timeout=5).json()["requests"]
+
+
+def wait_for(url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(url, timeout=1, allow_redirects=False)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def login(base_url):
+    session = requests.Session()
+    response = session.post(f"{base_url}/login", data={"username": ADMIN_USER, "password": ADMIN_PASS},
+                            allow_redirects=False, timeout=10)
+    if response.status_code != 302:
+        raise RuntimeError(f"Login failed ({response.status_code})")
+    return session
+
+
+def bench_route(session, base_url, store_url, route, total, concurrency, warmup):
+    url = f"{base_url}{route}"
+    for _ in range(warmup):
+        session.get(url, timeout=60)
+
+    def timed(_):
+        started = time.perf_counter()
+        response = session.get(url, timeout=60)
+        response.content
+        return time.perf_counter() - started, response.status_code
+
+    calls_before = upstream_calls(store_url)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, range(total)))
+    elapsed = time.perf_counter() - started
+    calls = upstream_calls(store_url) - calls_before
+
+    latencies = [latency for latency, _ in results]
+    return {
+        "requests": total,
+        "errors": sum(1 for _, status in results if status >= 400),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "rps": round(total / elapsed, 1),
+        "upstream_per_request": round(calls / total, 2),
+    }
+
+
+def print_report(results, baseline):
+    print(f"{'route':<14}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'up/req':>8}{'errors':>8}   vs baseline (p95, req/s)")
+    for route, r in results.items():
+        line = (f"{route:<14}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}{r['rps']:>9}"
+                f"{r['upstream_per_request']:>8}{r['errors']:>8}")
+        base = baseline.get(route)
+        if base:
+            p95 = (r['p95_ms'] - base['p95_ms']) / base['p95_ms'] * 100 if base['p95_ms'] else 0
+            rps = (r['rps'] - base['rps']) / base['rps'] * 100 if base['rps'] else 0
+            line += f"   {p95:+.0f}%  {rps:+.0f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard load benchmark")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per route")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn workers")
+    parser.add_argument('--threads', type=int, default=16, help="gunicorn threads per worker")
+    parser.add_argument('--mode', choices=('threads', 'gevent'), default='threads', help="SERVER_MODE (see gunicorn.conf.py)")
+    parser.add_argument('--latency', type=float, default=120, help="Fake store latency per call (ms)")
+    parser.add_argument('--jitter', type=float, default=30)
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--products', type=int, default=300)
+    parser.add_argument('--customers', type=int, default=800)
+    parser.add_argument('--mirror', action='store_true', help="Fully sync the local mirror before the run")
+    parser.add_argument('--routes', nargs='*', default=ROUTES)
+    parser.add_argument('--save-baseline', action='store_true', help=f"Write the results to {BASELINE_PATH}")
+    args = parser.parse_args()
+
+    store = serve(0, args.latency, args.jitter, args.products, args.orders, args.customers)
+    store_url = f"http://127.0.0.1:{store.server_port}"
+    workdir = tempfile.mkdtemp(prefix='omaya-bench-')
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(
+        os.environ,
+        WC_URL=store_url,
+        ADMIN_USER=ADMIN_USER,
+        ADMIN_PASS=ADMIN_PASS,
+        MIRROR_DB_PATH=os.path.join(workdir, 'mirror.sqlite3'),
+        WC_CACHE_PATH=os.path.join(workdir, 'cache.sqlite3'),
+        METRICS_DIR=os.path.join(workdir, 'metrics'),
+        THUMB_CACHE_PATH=os.path.join(workdir, 'thumbs'),
+        MIRROR_SYNC_INTERVAL='0',
+        SERVER_MODE=args.mode,
+        GUNICORN_THREADS=str(args.threads),
+    )
+
+    if args.mirror:
+        # Run the sync as its own process, exactly like the cron job does
+        subprocess.run([sys.executable, 'sync_mirror.py', '--full'], cwd=ROOT, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+
+    server = subprocess.Popen(
+        ['gunicorn', '--bind', f"127.0.0.1:{port}", '--workers', str(args.workers), '--log-level', 'warning',
+         'dashboard_app.app:app'],
+        cwd=ROOT, env=env,
+    )
+    try:
+        wait_for(f"{base_url}/login")
+        session = login(base_url)
+        results = {}
+        for route in args.routes:
+            requests.post(f"{store_url}/__reset", timeout=5)
+            results[route] = bench_route(session, base_url, store_url, route, args.requests,
+                                         args.concurrency, args.warmup)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+        store.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f).get("mirror" if args.mirror else "api", {}).get("routes", {})
+    print(f"{args.requests} requests/route, concurrency {args.concurrency}, "
+          f"{args.workers}x{args.threads if args.mode == 'threads' else 'gevent'} gunicorn, store latency {args.latency}ms, "
+          f"{'mirror' if args.mirror else 'live API'} mode")
+    print_report(results, baseline)
+
+    if args.save_baseline:
+        saved = {}
+        if os.path.exists(BASELINE_PATH):
+            with open(BASELINE_PATH) as f:
+                saved = json.load(f)
+        saved["mirror" if args.mirror else "api"] = {
+            "settings": {name: getattr(args, name) for name in
+                         ('requests', 'concurrency', 'workers', 'threads', 'mode', 'latency', 'orders', 'products', 'customers')},
+            "routes": results,
+        }
+        with open(BASELINE_PATH, 'w') as f:
+            json.dump(saved, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline saved to {BASELINE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+from dashboard_app.static_assets import ASSETS_BUILD, ASSETS_SOURCE, build, brotli
+
+# Usage: python build_assets.py
+# Fingerprints and precompresses dashboard_app/assets into the build directory.
+# Run it on every deploy (before starting gunicorn); without a build the app serves the source files.
+
+if __name__ == "__main__":
+    manifest = build(ASSETS_SOURCE, ASSETS_BUILD)
+    encodings = "gzip + brotli" if brotli is not None else "gzip (pip install Brotli for .br files)"
+    print(f"Built {len(manifest)} assets into {ASSETS_BUILD} ({encodings})")
@@ -1,6 +1,11 @@
-from flask import Flask, jsonify, send_from_directory, render_template, request, redirect, url_for, session
-from woocommerce import API
+from flask import Flask, Response, jsonify, send_file, send_from_directory, render_template, request, redirect, url_for, session, stream_with_context, abort, g
+from flask import before_render_template, template_rendered
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import date, timedelta
+from urllib.parse import urlparse
+import json
 import os
+import time
 
 # Try importing Google Services with fallback
 try:
@@ -12,8 +17,76 @@ except ImportError:
         def get_ga4_data(): return {"active_users": "N/A", "total_users": "N/A", "status": "error"}
         def get_gsc_data(): return {"clicks": 0, "impressions": 0, "status": "error"}
 
-app = Flask(__name__, static_folder='assets', static_url_path='/assets')
+try:
+    from dashboard_app.mirror import Mirror, start_background_sync
+    from dashboard_app.webhooks import WebhookProcessor, verify_signature
+    from dashboard_app.listing import LIST_OPTIONS, parse_list_args, fetch_page, api_params, mirror_filters
+    from dashboard_app.export import EXPORT_RESOURCES, EXPORT_FORMATS, iter_api_records, export_lines
+    from dashboard_app.reports import Reports, SERIES_BUCKETS
+    from dashboard_app.search import SEARCH_LIMIT, SEARCH_RESOURCES, SearchIndex
+    from dashboard_app.bulk import BULK_MAX_ITEMS, BulkActions
+    from dashboard_app.live import StatsBroadcaster
+    from dashboard_app.stores import make_registry
+    from dashboard_app.static_assets import asset_url, send_asset
+    from dashboard_app.http_cache import compress_response, conditional, make_etag
+    from dashboard_app import metrics
+    from dashboard_app.thumbnails import THUMBNAILS_ENABLED, THUMB_FORMATS, THUMB_MAX_AGE, ThumbnailCache, ThumbnailError, thumb_key, thumb_size
+except ImportError:
+    from mirror import Mirror, start_background_sync
+    from webhooks import WebhookProcessor, verify_signature
+    from listing import LIST_OPTIONS, parse_list_args, fetch_page, api_params, mirror_filters
+    from export import EXPORT_RESOURCES, EXPORT_FORMATS, iter_api_records, export_lines
+    from reports import Reports, SERIES_BUCKETS
+    from search import SEARCH_LIMIT, SEARCH_RESOURCES, SearchIndex
+    from bulk import BULK_MAX_ITEMS, BulkActions
+    from live import StatsBroadcaster
+    from stores import make_registry
+    from static_assets import asset_url, send_asset
+    from http_cache import compress_response, conditional, make_etag
+    import metrics
+    from thumbnails import THUMBNAILS_ENABLED, THUMB_FORMATS, THUMB_MAX_AGE, ThumbnailCache, ThumbnailError, thumb_key, thumb_size
+
+# Assets are served by the `assets` route below (fingerprinted, precompressed)
+app = Flask(__name__, static_folder=None)
 app.secret_key = 'omaya_secret_key_2024'  # Required for session
+app.add_template_global(asset_url)
+app.after_request(compress_response)
+
+# Metrics Configuration
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # When set, /metrics requires "Authorization: Bearer <token>"
+
+@app.before_request
+def start_request_metrics():
+    g.metrics_started = time.perf_counter()
+    g.metrics_route = request.url_rule.rule if request.url_rule else 'unmatched'
+    metrics.gauge_add("dashboard_requests_in_flight", {"route": g.metrics_route}, 1)
+
+@app.after_request
+def record_response_status(response):
+    g.metrics_status = response.status_code
+    return response
+
+@app.teardown_request
+def finish_request_metrics(exc):
+    if 'metrics_started' not in g:
+        return
+    metrics.gauge_add("dashboard_requests_in_flight", {"route": g.metrics_route}, -1)
+    metrics.observe(
+        "dashboard_request_duration_seconds",
+        {"route": g.metrics_route, "method": request.method, "status": str(g.get('metrics_status', 500))},
+        time.perf_counter() - g.metrics_started,
+    )
+
+def start_template_timer(sender, template, context, **extra):
+    g.template_started = time.perf_counter()
+
+def record_template_time(sender, template, context, **extra):
+    if 'template_started' in g:
+        metrics.observe("dashboard_template_render_seconds", {"template": template.name},
+                        time.perf_counter() - g.pop('template_started'))
+
+before_render_template.connect(start_template_timer, app)
+template_rendered.connect(record_template_time, app)
 
 # Admin Credentials
 ADMIN_USER = os.environ.get('ADMIN_USER', 'admin')
@@ -29,91 +102,432 @@ WC_URL = os.environ.get('WC_URL', DEFAULT_WC_URL)
 WC_CK = os.environ.get('WC_CONSUMER_KEY', DEFAULT_WC_CK)
 WC_CS = os.environ.get('WC_CONSUMER_SECRET', DEFAULT_WC_CS)
 
-wcapi = API(
-    url=WC_URL,
-    consumer_key=WC_CK,
-    consumer_secret=WC_CS,
-    version="wc/v3",
-    timeout=20
-)
+# Every store we manage, each with its own pool, rate limit and cache namespace (see stores.py).
+# WC_URL/keys are the primary store unless WC_STORES lists several.
+stores = make_registry(WC_URL, WC_CK, WC_CS)
+
+# The primary store backs the regular pages: pooled keep-alive client with retries,
+# behind the shared read cache (TTL + stale-while-revalidate)
+wcapi = stores.primary.client
+wc_cache = stores.primary.cache
+
+# Local mirror of the store; list pages and stats read from it once it has synced
+mirror = Mirror()
+_sync_started = False
+
+# Sales rollups maintained incrementally as orders reach the mirror
+reports_engine = Reports(mirror)
+
+# Full-text index (Arabic-normalized, prefix matching) behind the header search box
+search_index = SearchIndex(mirror)
+
+# Background work that should not hold up a response (e.g. prefetching the next list page)
+background_executor = ThreadPoolExecutor(max_workers=4)
+
+# Push updates from WooCommerce webhooks into the mirror and cache
+webhook_processor = WebhookProcessor(mirror, wc_cache)
+
+# Bulk order actions (orders/batch in chunks, run concurrently)
+bulk_actions = BulkActions(wcapi, mirror, wc_cache)
+
+# Product thumbnails: only images on the store (plus any extra CDN hosts) are proxied
+_store_host = urlparse(stores.primary.url).hostname or ''
+THUMB_ALLOWED_HOSTS = [_store_host, f"www.{_store_host}"] + [
+    h.strip() for h in os.environ.get('THUMB_ALLOWED_HOSTS', '').split(',') if h.strip()
+]
+thumbnails = ThumbnailCache(THUMB_ALLOWED_HOSTS)
+
+def thumb_url(src, size=128):
+    """
+    Thumbnail URL for a product image; images on other hosts (a CDN, offloaded media) are linked as they are.
+    """
+    if not THUMBNAILS_ENABLED or not thumbnails.allowed(src):
+        return src
+    return url_for('thumbnail', src=src, size=size)
+
+app.add_template_global(thumb_url)
+
+@app.before_request
+def ensure_background_sync():
+    # Started on the first request (not at import) so scripts importing the app don't sync
+    global _sync_started
+    if not _sync_started:
+        _sync_started = True
+        start_background_sync(mirror, wcapi)
+
+def data_etag(*resources, extra=None):
+    """
+    ETag function for `conditional`: the page URL plus the mirror version of each
+    resource it shows. Opts out while any of them is still served from the API.
+    """
+    def etag():
+        if 'logged_in' not in session:
+            return None
+        versions = []
+        for resource in resources:
+            if not mirror.is_ready(resource):
+                return None
+            versions.append(mirror.get_state(resource)['version'])
+        return make_etag(request.full_path, versions, extra() if extra else None)
+    return etag
+
+def list_records(resource, per_page=20):
+    """
+    Returns the first page of a resource from the mirror, or from the (cached) API until it has synced.
+    """
+    if mirror.is_ready(resource):
+        return mirror.list(resource, limit=per_page)
+
+    try:
+        response = wc_cache.get(resource, params={"per_page": per_page})
+        return response.json() if response.status_code == 200 else []
+    except Exception as e:
+        # Shown as an empty list; the failed call is counted in /metrics
+        print(f"List Error ({resource}): {e}")
+        return []
+
+def render_list(template, resource):
+    """
+    Renders a paginated, sortable, filterable list page for a resource.
+    """
+    query = parse_list_args(resource, request.args)
+    records, total, total_pages = fetch_page(resource, query, mirror, wc_cache, executor=background_executor)
+    return render_template(
+        template,
+        **{resource: records},
+        query=query,
+        options=LIST_OPTIONS[resource],
+        total=total,
+        total_pages=total_pages,
+    )
 
 @app.route('/')
+@conditional(data_etag())
 def index():
     if 'logged_in' not in session:
         return redirect(url_for('login'))
-    
-    # Fetch recent orders for the dashboard
-    try:
-        response = wcapi.get("orders", params={"per_page": 5})
-        recent_orders = response.json() if response.status_code == 200 else []
-    except:
-        recent_orders = []
 
-    # Fetch Google Data
-    ga4_data = get_ga4_data()
-    gsc_data = get_gsc_data()
+    # Render the shell straight away; every widget loads from its own endpoint in parallel
+    return render_template('dashboard.html')
+
+# Browser cache lifetime (seconds) for each dashboard widget
+WIDGET_MAX_AGE = {
+    "recent-orders": 30,
+    "ga4": 300,
+    "gsc": 300,
+}
 
-    return render_template('dashboard.html', recent_orders=recent_orders, ga4=ga4_data, gsc=gsc_data)
+def widget_cache_control(name):
+    max_age = WIDGET_MAX_AGE[name]
+    return f"private, max-age={max_age}, stale-while-revalidate={max_age * 4}"
+
+# Google widget payloads the browser may keep; the loading placeholder and errors must be asked for again
+CACHEABLE_WIDGET_STATUSES = ("live", "demo")
+
+def widget_response(name, data):
+    response = jsonify(data)
+    if isinstance(data, dict) and data.get("status") not in CACHEABLE_WIDGET_STATUSES:
+        response.headers['Cache-Control'] = "no-store"
+    else:
+        response.headers['Cache-Control'] = widget_cache_control(name)
+    return response
+
+@app.route('/api/widgets/recent-orders')
+@conditional(data_etag('orders'), cache_control=widget_cache_control("recent-orders"))
+def widget_recent_orders():
+    if 'logged_in' not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    orders_data = [
+        {
+            "id": order.get('id'),
+            "date_created": order.get('date_created'),
+            "total": order.get('total'),
+            "currency": order.get('currency'),
+            "status": order.get('status'),
+            "country": (order.get('billing') or {}).get('country'),
+        }
+        for order in list_records("orders", per_page=5)
+    ]
+    return widget_response("recent-orders", orders_data)
+
+@app.route('/api/widgets/ga4')
+def widget_ga4():
+    if 'logged_in' not in session:
+        return jsonify({"error": "unauthorized"}), 401
+    return widget_response("ga4", get_ga4_data())
+
+@app.route('/api/widgets/gsc')
+def widget_gsc():
+    if 'logged_in' not in session:
+        return jsonify({"error": "unauthorized"}), 401
+    return widget_response("gsc", get_gsc_data())
 
 @app.route('/products')
+@conditional(data_etag('products'))
 def products():
     if 'logged_in' not in session:
         return redirect(url_for('login'))
-    
-    try:
-        response = wcapi.get("products", params={"per_page": 20})
-        products_data = response.json() if response.status_code == 200 else []
-    except:
-        products_data = []
-        
-    return render_template('products.html', products=products_data)
+
+    return render_list('products.html', "products")
 
 @app.route('/orders')
+@conditional(data_etag('orders'))
 def orders():
     if 'logged_in' not in session:
         return redirect(url_for('login'))
-        
-    try:
-        response = wcapi.get("orders", params={"per_page": 20})
-        orders_data = response.json() if response.status_code == 200 else []
-    except:
-        orders_data = []
-        
-    return render_template('orders.html', orders=orders_data)
+
+    return render_list('orders.html', "orders")
 
 @app.route('/customers')
+@conditional(data_etag('customers'))
 def customers():
     if 'logged_in' not in session:
         return redirect(url_for('login'))
-        
-    try:
-        response = wcapi.get("customers", params={"per_page": 20})
-        customers_data = response.json() if response.status_code == 200 else []
-    except:
-        customers_data = []
-        
-    return render_template('customers.html', customers=customers_data)
+
+    return render_list('customers.html', "customers")
+
+@app.route('/thumb')
+def thumbnail():
+    if 'logged_in' not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    src = request.args.get('src', '')
+    if not thumbnails.allowed(src):
+        abort(400)
+    if not THUMBNAILS_ENABLED:
+        return redirect(src)
+
+    size = thumb_size(request.args.get('size', 128, type=int))
+    # Only when listed explicitly: "*/*" and "image/*" also match image/webp, and older Safari sends those
+    fmt = 'webp' if any(value == 'image/webp' and quality > 0 for value, quality in request.accept_mimetypes) else 'jpeg'
+    key = thumb_key(src, size, fmt)
+    if request.if_none_match.contains(key):
+        # Answered without touching the disk cache or the store
+        response = Response(status=304)
+        response.set_etag(key)
+    else:
+        try:
+            key, path = thumbnails.get(src, size, fmt)
+        except ThumbnailError as e:
+            print(f"Thumbnail Error: {e}")
+            return redirect(src)
+        response = send_file(path, mimetype=THUMB_FORMATS[fmt], etag=key, conditional=True)
+
+    # Behind the login, so only the browser may keep it
+    response.cache_control.no_cache = None
+    response.cache_control.public = None
+    response.cache_control.private = True
+    response.cache_control.max_age = THUMB_MAX_AGE
+    response.vary.add('Accept')
+    return response
+
+@app.route('/export/<resource>.<fmt>')
+def export(resource, fmt):
+    if 'logged_in' not in session:
+        return redirect(url_for('login'))
+    if resource not in EXPORT_RESOURCES or fmt not in EXPORT_FORMATS:
+        abort(404)
+
+    # Same filters and sort as the list page the export was started from
+    query = parse_list_args(resource, request.args)
+    include = parse_ids(request.args.get('include', '').split(','))
+    if include and mirror.is_ready(resource):
+        # Just the rows selected on the list page
+        records = filter(None, (mirror.get(resource, record_id) for record_id in include))
+    elif include:
+        records = iter_api_records(wcapi, resource, {"include": ",".join(map(str, include)), "orderby": "include"})
+    elif mirror.is_ready(resource):
+        records = mirror.iter_query(resource, **mirror_filters(resource, query))
+    else:
+        params = api_params(resource, query)
+        params.pop('_fields')
+        records = iter_api_records(wcapi, resource, params)
+
+    filename = f"{resource}-{time.strftime('%Y-%m-%d')}.{fmt}"
+    return Response(
+        stream_with_context(export_lines(resource, fmt, records)),
+        mimetype=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+def parse_ids(values):
+    """
+    Order-preserving, de-duplicated positive ids from a list of strings/ints; anything else is dropped.
+    """
+    ids = []
+    for value in values:
+        try:
+            record_id = int(value)
+        except (TypeError, ValueError):
+            continue
+        if record_id > 0 and record_id not in ids:
+            ids.append(record_id)
+    return ids
+
+def matching_order_ids(filters):
+    """
+    Ids of every order matching the orders page filters (for "select all matching").
+    """
+    # The filter comes from a JSON body; parse_list_args expects query-string values
+    args = {name: str(value) for name, value in filters.items() if isinstance(value, (str, int, float))}
+    query = parse_list_args("orders", args)
+    if mirror.is_ready("orders"):
+        records = mirror.iter_query("orders", **mirror_filters("orders", query))
+    else:
+        params = api_params("orders", query)
+        params['_fields'] = 'id'
+        records = iter_api_records(wcapi, "orders", params)
+    ids = []
+    for record in records:
+        ids.append(record['id'])
+        if len(ids) > BULK_MAX_ITEMS:
+            break
+    return ids
+
+@app.route('/api/orders/bulk', methods=['POST'])
+def orders_bulk():
+    """
+    Applies one action to many orders. JSON body:
+    {"action": "status", "status": "completed", "ids": [...]} or
+    {"action": "note", "note": "...", "customer_note": false, "ids": [...]};
+    "filter": {<orders page query args>} instead of "ids" selects every matching order.
+    """
+    if 'logged_in' not in session:
+        return jsonify({"error": "unauthorized"}), 401
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return jsonify({"error": "expected a JSON body"}), 400
+
+    if isinstance(payload.get('filter'), dict):
+        try:
+            ids = matching_order_ids(payload['filter'])
+        except Exception as e:
+            print(f"Bulk Error (matching orders): {e}")
+            return jsonify({"error": "could not list the matching orders, try again"}), 502
+    else:
+        ids = parse_ids(payload.get('ids') or [])
+    if not ids:
+        return jsonify({"error": "no orders selected"}), 400
+    if len(ids) > BULK_MAX_ITEMS:
+        return jsonify({"error": f"at most {BULK_MAX_ITEMS} orders per bulk action"}), 400
+
+    action = payload.get('action')
+    if action == 'status':
+        status = payload.get('status')
+        if status not in LIST_OPTIONS['orders']['statuses']:
+            return jsonify({"error": f"unknown status {status!r}"}), 400
+        results = bulk_actions.set_status(ids, status)
+    elif action == 'note':
+        note = (payload.get('note') or '').strip()
+        if not note:
+            return jsonify({"error": "note is empty"}), 400
+        results = bulk_actions.add_note(ids, note, customer_note=bool(payload.get('customer_note')))
+    else:
+        return jsonify({"error": "action must be status or note"}), 400
+
+    failed = sum(1 for result in results if not result['ok'])
+    return jsonify({"results": results, "updated": len(results) - failed, "failed": failed})
 
 @app.route('/marketing')
+@conditional(data_etag('coupons'))
 def marketing():
     if 'logged_in' not in session:
         return redirect(url_for('login'))
         
-    try:
-        response = wcapi.get("coupons", params={"per_page": 20})
-        coupons_data = response.json() if response.status_code == 200 else []
-    except:
-        coupons_data = []
-        
+    coupons_data = list_records("coupons")
+
     return render_template('marketing.html', coupons=coupons_data)
 
+# Date range presets offered on the reports page (days back from today)
+REPORT_RANGES = [7, 30, 90, 365]
+
+def parse_report_range(args):
+    """
+    Returns (start, end) ISO dates from ?days=N or ?start=&end=, defaulting to the last 30 days.
+    """
+    today = date.today()
+    try:
+        start = date.fromisoformat(args.get('start', ''))
+        end = date.fromisoformat(args.get('end', ''))
+        if start <= end:
+            return start.isoformat(), end.isoformat()
+    except ValueError:
+        pass
+
+    days = args.get('days', type=int)
+    days = days if days in REPORT_RANGES else 30
+    return (today - timedelta(days=days - 1)).isoformat(), today.isoformat()
+
 @app.route('/reports')
+# Preset ranges end today, so the date is part of the tag
+@conditional(data_etag('orders', 'products', extra=lambda: date.today().isoformat()))
 def reports():
     if 'logged_in' not in session:
         return redirect(url_for('login'))
-    return render_template('reports.html')
+
+    start, end = parse_report_range(request.args)
+    days = request.args.get('days', type=int)
+    return render_template(
+        'reports.html',
+        ready=mirror.is_ready("orders"),
+        start=start,
+        end=end,
+        active_days=None if 'start' in request.args else (days if days in REPORT_RANGES else 30),
+        ranges=REPORT_RANGES,
+        categories=reports_engine.sales_by_category(start, end),
+        top_products=reports_engine.top_products(start, end),
+    )
+
+# Default range (days back from today) for each sales chart resolution
+SERIES_DEFAULT_DAYS = {"hour": 2, "day": 30, "week": 182, "month": 365}
+
+@app.route('/api/sales/series')
+@conditional(data_etag('orders', extra=lambda: date.today().isoformat()))
+def sales_series():
+    if 'logged_in' not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in SERIES_BUCKETS:
+        bucket = 'day'
+    today = date.today()
+    try:
+        start = date.fromisoformat(request.args.get('start', ''))
+        end = date.fromisoformat(request.args.get('end', ''))
+        if start > end:
+            raise ValueError
+    except ValueError:
+        start, end = today - timedelta(days=SERIES_DEFAULT_DAYS[bucket] - 1), today
+
+    series = reports_engine.sales_series(bucket, start.isoformat(), end.isoformat())
+    series.update(start=start.isoformat(), end=end.isoformat(), ready=mirror.is_ready("orders"))
+    return jsonify(series)
+
+@app.route('/api/search')
+@conditional(data_etag(*SEARCH_RESOURCES), cache_control="private, max-age=30")
+def search():
+    """
+    Type-ahead matches from the local search index, e.g. /api/search?q=ميلف&type=products
+    """
+    if 'logged_in' not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    resource = request.args.get('type')
+    if resource and resource not in SEARCH_RESOURCES:
+        return jsonify({"error": f"type must be one of {', '.join(SEARCH_RESOURCES)}"}), 400
+    limit = max(1, min(request.args.get('limit', SEARCH_LIMIT, type=int), 50))  # SQLite reads a negative LIMIT as none
+
+    results = search_index.search(request.args.get('q', ''), resource=resource, limit=limit)
+    for result in results:
+        result["url"] = url_for(result["type"], search=result["id"])
+    return jsonify({
+        "results": results,
+        "ready": all(mirror.is_ready(name) for name in SEARCH_RESOURCES),
+    })
 
 @app.route('/settings')
+@conditional(data_etag())
 def settings():
     if 'logged_in' not in session:
         return redirect(url_for('login'))
@@ -140,46 +554,165 @@ def logout():
     session.pop('logged_in', None)
     return redirect(url_for('login'))
 
-@app.route('/<path:path>')
-def serve_static(path):
-    if path == 'favicon.ico': 
-        return send_from_directory('.', path)
-    return send_from_directory('.', path)
+@app.route('/assets/<path:filename>')
+def assets(filename):
+    return send_asset(filename)
+
+@app.route('/favicon.ico')
+def favicon():
+    return send_asset('images/favicon.ico')
+
+@app.route('/<page>.html')
+def theme_page(page):
+    # Only the bundled theme pages; the rest of the app directory is not public
+    return send_from_directory(app.root_path, f"{page}.html")
+
+@app.route('/webhooks/woocommerce', methods=['POST'])
+def woocommerce_webhook():
+    body = request.get_data()
+    topic = request.headers.get('X-WC-Webhook-Topic')
+    if not topic:
+        # WooCommerce sends an unsigned ping (webhook_id=...) when a webhook is created
+        return jsonify({"status": "ok"})
+
+    if not verify_signature(body, request.headers.get('X-WC-Webhook-Signature')):
+        return jsonify({"error": "invalid signature"}), 401
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        return jsonify({"error": "invalid payload"}), 400
+
+    # Only queue here; the mirror and cache are updated in the background so we answer immediately
+    accepted = webhook_processor.submit(topic, payload, request.headers.get('X-WC-Webhook-Delivery-ID'))
+    return jsonify({"status": "queued" if accepted else "ignored"})
+
+# Upstream sources behind /api/stats: name -> (endpoint, params, deadline in seconds)
+STATS_SOURCES = {
+    "orders": ("orders", {"per_page": 1}, 3),
+    "products": ("products", {"per_page": 1}, 3),
+    "customers": ("customers", {"per_page": 1}, 3),
+    "sales": ("reports/sales", {"period": "year"}, 5),
+}
+
+# Shared pool so the stats calls run concurrently instead of one after another
+stats_executor = ThreadPoolExecutor(max_workers=8)
+
+def fetch_stat(name):
+    # Answer locally when the mirror has the data
+    if name == "sales" and mirror.is_ready("orders"):
+        return mirror.sales_total(since=time.strftime('%Y-01-01'))
+    if name != "sales" and mirror.is_ready(name):
+        return mirror.count(name)
+
+    endpoint, params, _ = STATS_SOURCES[name]
+    response = wc_cache.get(endpoint, params=params)
+    if response.status_code != 200:
+        raise RuntimeError(f"{endpoint} returned {response.status_code}")
+
+    if name == "sales":
+        data = response.json()
+        return data[0]['total_sales'] if data else 0
+    return response.headers.get('X-WP-Total')
+
+def collect_stats():
+    """
+    Returns the stats counters plus a per-field status map (ok/timeout/error).
+    """
+    # Issue all upstream calls at once; each one gets its own deadline.
+    # A call that misses its deadline keeps running and fills the cache for the next request.
+    started = time.monotonic()
+    futures = {name: stats_executor.submit(fetch_stat, name) for name in STATS_SOURCES}
+
+    stats = {}
+    status = {}
+    for name, future in futures.items():
+        deadline = STATS_SOURCES[name][2]
+        try:
+            stats[name] = future.result(timeout=max(0, deadline - (time.monotonic() - started)))
+            status[name] = "ok"
+        except FutureTimeoutError:
+            stats[name] = None
+            status[name] = "timeout"
+        except Exception as e:
+            print(f"Stats Error ({name}): {e}")
+            stats[name] = None
+            status[name] = "error"
+
+    stats["status"] = status
+    return stats
+
+# One shared poller per process (one upstream poller across processes) behind the live stream
+stats_broadcaster = StatsBroadcaster(collect_stats, mirror)
 
 @app.route('/api/stats')
+@conditional(
+    data_etag('orders', 'products', 'customers', extra=lambda: time.strftime('%Y')),
+    cache_control="private, max-age=30, stale-while-revalidate=120",
+)
 def get_stats():
-    try:
-        # Fetch Orders (Example Stat)
-        orders_resp = wcapi.get("orders", params={"per_page": 1})
-        orders_count = orders_resp.headers.get('X-WP-Total')
-        
-        # Fetch Products Count
-        products_resp = wcapi.get("products", params={"per_page": 1})
-        products_count = products_resp.headers.get('X-WP-Total')
-        
-        # Fetch Customers Count
-        customers_resp = wcapi.get("customers", params={"per_page": 1})
-        customers_count = customers_resp.headers.get('X-WP-Total')
-
-        # Calculate Total Sales
-        reports_resp = wcapi.get("reports/sales", params={"period": "year"})
-        if reports_resp.status_code == 200:
-            data = reports_resp.json()
-            total_sales = data[0]['total_sales'] if data else 0
-        else:
-            total_sales = "Error"
-        
-        # Simplified for speed
-        # total_sales = "N/A" # Reports API is often faster
-
-        return jsonify({
-            "orders": orders_count,
-            "products": products_count,
-            "customers": customers_count,
-            "sales": total_sales
-        })
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    stats = collect_stats()
+    response = jsonify(stats)
+    # Only cache complete answers; a partial one should be retried on the next view
+    if all(value == "ok" for value in stats["status"].values()):
+        response.headers['Cache-Control'] = "private, max-age=30, stale-while-revalidate=120"
+    return response
+
+@app.route('/api/stats/stream')
+def stats_stream():
+    if 'logged_in' not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    return Response(
+        stats_broadcaster.stream(),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+def store_summary(store):
+    # The primary store answers from the mirror when it has synced
+    if store is stores.primary and mirror.is_ready("orders"):
+        return {"orders": mirror.count("orders"), "sales": mirror.sales_total(since=time.strftime('%Y-01-01'))}
+    return store.summary()
+
+@app.route('/stores')
+def stores_page():
+    if 'logged_in' not in session:
+        return redirect(url_for('login'))
+    return render_template('stores.html', stores=list(stores))
+
+@app.route('/api/stores/summary')
+def stores_summary():
+    """
+    Orders and this year's sales for every store, queried concurrently, plus totals per currency.
+    """
+    if 'logged_in' not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    results = stores.fan_out(store_summary)
+    rows = []
+    totals = {}
+    for store in stores:
+        summary, status = results[store.id]
+        rows.append({"id": store.id, "name": store.name, "currency": store.currency, "status": status,
+                     "orders": summary["orders"] if summary else None,
+                     "sales": float(summary["sales"]) if summary else None})
+        if summary:
+            total = totals.setdefault(store.currency, {"currency": store.currency, "orders": 0, "sales": 0.0})
+            total["orders"] += summary["orders"]
+            total["sales"] += float(summary["sales"])
+
+    response = jsonify({"stores": rows, "totals": list(totals.values())})
+    # Only cache complete answers; a partial one should be retried on the next view
+    if all(row["status"] == "ok" for row in rows):
+        response.headers['Cache-Control'] = "private, max-age=30, stale-while-revalidate=120"
+    return response
+
+@app.route('/metrics')
+def metrics_endpoint():
+    if METRICS_TOKEN and request.headers.get('Authorization') != f"Bearer {METRICS_TOKEN}":
+        return jsonify({"error": "unauthorized"}), 401
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     print("Dashboard running at http://localhost:5000")
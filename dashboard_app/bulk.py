@@ -0,0 +1,104 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from dashboard_app.webhooks import DEPENDENT_CACHE_PREFIXES
+except ImportError:
+    from webhooks import DEPENDENT_CACHE_PREFIXES
+
+# Bulk Action Configuration
+BATCH_SIZE = 100  # WooCommerce's limit for create + update + delete in one batch request
+BATCH_CONCURRENCY = int(os.environ.get('WC_BATCH_CONCURRENCY', 4))  # Batch (or note) requests in flight at once
+BULK_MAX_ITEMS = 2000  # Largest selection one bulk action may touch
+BATCH_TIMEOUT = 60  # Seconds; a batch of 100 updates runs every order's status hooks on the store
+
+
+def chunked(items, size=BATCH_SIZE):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+class BulkActions:
+    """
+    Applies one change to many orders through the REST API.
+
+    Status changes go through orders/batch, BATCH_SIZE orders per request,
+    with up to BATCH_CONCURRENCY requests in flight. Notes have no batch
+    endpoint, so each one is its own orders/<id>/notes request on the same pool.
+    Every order gets its own result; updated orders are written straight to
+    the mirror, and the cached listings are dropped.
+    """
+
+    def __init__(self, client, mirror, cache, concurrency=BATCH_CONCURRENCY):
+        self.client = client
+        self.mirror = mirror
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def set_status(self, order_ids, status):
+        """
+        [{"id", "ok", "status" | "error"}] per order, in the order given.
+        """
+        chunks = chunked([{"id": order_id, "status": status} for order_id in order_ids])
+        results = []
+        for chunk_results in self._executor.map(self._update_chunk, chunks):
+            results.extend(chunk_results)
+        self._refresh([r.pop("record") for r in results if r.get("record")])
+        return results
+
+    def add_note(self, order_ids, note, customer_note=False):
+        """
+        [{"id", "ok", "error"?}] per order, in the order given.
+        """
+        def add(order_id):
+            try:
+                response = self.client.post(f"orders/{order_id}/notes", {"note": note, "customer_note": customer_note},
+                                            timeout=BATCH_TIMEOUT)
+            except Exception as e:
+                return {"id": order_id, "ok": False, "error": str(e)}
+            if response.status_code not in (200, 201):
+                return {"id": order_id, "ok": False, "error": _error_message(response)}
+            return {"id": order_id, "ok": True}
+
+        return list(self._executor.map(add, order_ids))
+
+    def _update_chunk(self, updates):
+        failed = lambda message: [{"id": u["id"], "ok": False, "error": message} for u in updates]
+        try:
+            response = self.client.post("orders/batch", {"update": updates}, timeout=BATCH_TIMEOUT)
+        except Exception as e:
+            print(f"Bulk Error (orders/batch): {e}")
+            return failed(str(e))
+        if response.status_code != 200:
+            return failed(_error_message(response))
+
+        # Items come back in request order; failed ones carry an "error" object instead of the order
+        returned = (response.json() or {}).get("update") or []
+        results = []
+        for update, item in zip(updates, returned):
+            error = item.get("error") if isinstance(item, dict) else None
+            if error or not isinstance(item, dict):
+                results.append({"id": update["id"], "ok": False,
+                                "error": (error or {}).get("message") or "Not updated"})
+            else:
+                results.append({"id": update["id"], "ok": True, "status": item.get("status"), "record": item})
+        results.extend(failed("No result returned")[len(returned):])
+        return results
+
+    def _refresh(self, records):
+        if not records:
+            return
+        try:
+            self.mirror.upsert_many("orders", records)
+        except Exception as e:
+            # The next sync picks the changes up
+            print(f"Bulk Error (mirror): {e}")
+        self.cache.invalidate("orders")
+        for prefix in DEPENDENT_CACHE_PREFIXES.get("orders", ()):
+            self.cache.invalidate(prefix)
+
+
+def _error_message(response):
+    try:
+        return response.json().get("message") or f"HTTP {response.status_code}"
+    except (ValueError, AttributeError):
+        return f"HTTP {response.status_code}"
@@ -0,0 +1,281 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+try:
+    from dashboard_app.metrics import inc
+    from dashboard_app.resilience import BreakerRegistry, CircuitOpenError, SingleFlight, endpoint_label
+    from dashboard_app.transport import RateLimitedError
+except ImportError:
+    from metrics import inc
+    from resilience import BreakerRegistry, CircuitOpenError, SingleFlight, endpoint_label
+    from transport import RateLimitedError
+
+# Cache Configuration
+# Backend: "sqlite" (shared by every gunicorn worker on the host) or "memory" (per process)
+CACHE_BACKEND = os.environ.get('WC_CACHE_BACKEND', 'sqlite')
+CACHE_PATH = os.environ.get('WC_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'omaya_wc_cache.sqlite3'))
+
+# How long (seconds) an entry is served as fresh, per resource (first segment of the endpoint)
+DEFAULT_TTLS = {
+    "orders": 30,
+    "products": 300,
+    "customers": 300,
+    "coupons": 600,
+    "reports": 300,
+}
+DEFAULT_TTL = 60
+
+# How long after expiry an entry may still be served while it is refreshed in the background
+STALE_TTL = int(os.environ.get('WC_CACHE_STALE_TTL', 600))
+
+# Per-call timeout (seconds) for dashboard reads, well under the client's 20s default
+READ_TIMEOUT = float(os.environ.get('WC_READ_TIMEOUT', 8))
+
+# Only these headers are kept with a cached entry (pagination totals)
+KEPT_HEADERS = ('X-WP-Total', 'X-WP-TotalPages')
+
+
+class CachedResponse:
+    """
+    Minimal stand-in for requests.Response, built from a cache entry.
+    Supports what the dashboard uses: status_code, headers and json().
+    """
+
+    def __init__(self, status_code, headers, body):
+        self.status_code = status_code
+        self.headers = headers
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+def make_key(endpoint, params=None):
+    """
+    Builds a stable cache key from the endpoint and its query params.
+    """
+    if not params:
+        return endpoint
+    return f"{endpoint}?{urlencode(sorted((k, str(v)) for k, v in params.items()))}"
+
+
+def resource_of(endpoint):
+    return endpoint.split('/', 1)[0]
+
+
+class MemoryBackend:
+    """
+    Per-process dictionary store.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key, stored_at, payload):
+        with self._lock:
+            self._data[key] = (stored_at, payload)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [k for k in self._data if k.startswith(prefix)]:
+                del self._data[key]
+
+
+class SQLiteBackend:
+    """
+    Store backed by a local SQLite file, shared by all worker processes on the host.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, stored_at REAL, payload TEXT)"
+        )
+
+    def _conn(self):
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute("SELECT stored_at, payload FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def set(self, key, stored_at, payload):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache (key, stored_at, payload) VALUES (?, ?, ?)",
+            (key, stored_at, json.dumps(payload)),
+        )
+
+    def delete_prefix(self, prefix):
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        self._conn().execute("DELETE FROM cache WHERE key LIKE ? ESCAPE '\\'", (escaped + '%',))
+
+
+class NamespacedBackend:
+    """
+    Prefixes every key, so several stores can share one cache file without collisions.
+    """
+
+    def __init__(self, backend, namespace):
+        self.backend = backend
+        self.prefix = f"{namespace}:"
+
+    def get(self, key):
+        return self.backend.get(self.prefix + key)
+
+    def set(self, key, stored_at, payload):
+        self.backend.set(self.prefix + key, stored_at, payload)
+
+    def delete_prefix(self, prefix):
+        self.backend.delete_prefix(self.prefix + prefix)
+
+
+class WooCache:
+    """
+    TTL + stale-while-revalidate cache around a WooCommerce API client.
+
+    Fresh entries are returned directly. Expired entries still inside the stale
+    window are returned immediately while a background thread refreshes them.
+    Anything older (or missing) is fetched synchronously. Only 200 responses are cached.
+
+    Concurrent misses for the same key share one upstream call. Each endpoint
+    has a circuit breaker: while the store keeps failing, calls fail fast and
+    the last known entry (of any age) is served instead.
+    """
+
+    def __init__(self, client, backend=None, ttls=None, stale_ttl=STALE_TTL):
+        self.client = client
+        self.backend = backend or MemoryBackend()
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.stale_ttl = stale_ttl
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.breakers = BreakerRegistry()
+
+    def ttl_for(self, endpoint):
+        return self.ttls.get(resource_of(endpoint), DEFAULT_TTL)
+
+    def get(self, endpoint, params=None, ttl=None):
+        key = make_key(endpoint, params)
+        ttl = self.ttl_for(endpoint) if ttl is None else ttl
+
+        entry = self.backend.get(key)
+        if entry is not None:
+            stored_at, payload = entry
+            age = time.time() - stored_at
+            if age < ttl:
+                inc("dashboard_cache_requests_total", {"cache": "woocommerce", "result": "hit"})
+                return self._to_response(payload)
+            if age < ttl + self.stale_ttl:
+                inc("dashboard_cache_requests_total", {"cache": "woocommerce", "result": "stale"})
+                self._refresh_in_background(key, endpoint, params)
+                return self._to_response(payload)
+
+        return self._fetch_or_last_known(key, endpoint, params, entry)
+
+    def invalidate(self, endpoint=''):
+        """
+        Drops every entry whose key starts with the given endpoint (all entries if empty).
+        """
+        self.backend.delete_prefix(endpoint)
+
+    def _fetch_or_last_known(self, key, endpoint, params, entry):
+        try:
+            response, shared = self._flight.do(key, lambda: self._fetch(key, endpoint, params))
+        except Exception:
+            if entry is None:
+                raise
+            inc("dashboard_cache_requests_total", {"cache": "woocommerce", "result": "fallback"})
+            return self._to_response(entry[1])
+
+        if response.status_code >= 500 or response.status_code == 429:
+            if entry is not None:
+                inc("dashboard_cache_requests_total", {"cache": "woocommerce", "result": "fallback"})
+                return self._to_response(entry[1])
+        inc("dashboard_cache_requests_total", {"cache": "woocommerce", "result": "coalesced" if shared else "miss"})
+        return response
+
+    def _fetch(self, key, endpoint, params):
+        breaker = self.breakers.get(endpoint)
+        if not breaker.allow():
+            inc("dashboard_circuit_rejections_total", {"endpoint": endpoint_label(endpoint)})
+            raise CircuitOpenError(f"{endpoint} circuit open, retrying in {breaker.retry_in():.0f}s")
+        try:
+            response = self.client.get(endpoint, params=dict(params or {}), timeout=READ_TIMEOUT)
+        except RateLimitedError:
+            # Our own rate limit, not a sign the store is unhealthy
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record(False)
+            raise
+        breaker.record(response.status_code < 500 and response.status_code != 429)
+        if response.status_code == 200:
+            payload = {
+                "status_code": response.status_code,
+                "headers": {h: response.headers[h] for h in KEPT_HEADERS if h in response.headers},
+                "body": response.json(),
+            }
+            self.backend.set(key, time.time(), payload)
+        return response
+
+    def _refresh_in_background(self, key, endpoint, params):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._flight.do(key, lambda: self._fetch(key, endpoint, params))
+            except Exception as e:
+                print(f"Cache refresh failed for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    @staticmethod
+    def _to_response(payload):
+        return CachedResponse(payload["status_code"], payload["headers"], payload["body"])
+
+
+def make_backend(kind=CACHE_BACKEND, path=CACHE_PATH):
+    if kind == 'sqlite':
+        try:
+            return SQLiteBackend(path)
+        except sqlite3.Error as e:
+            print(f"SQLite cache unavailable ({e}), falling back to memory cache")
+    return MemoryBackend()
+
+
+def make_cache(client, namespace=None):
+    """
+    Builds the WooCommerce cache configured from the environment.
+    Each store other than the primary one gets its own key namespace.
+    """
+    backend = make_backend()
+    if namespace:
+        backend = NamespacedBackend(backend, namespace)
+    return WooCache(client, backend=backend)
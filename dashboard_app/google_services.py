@@ -1,23 +1,61 @@
 import os
 import json
-from google.analytics.data_v1beta import BetaAnalyticsDataClient
-from google.analytics.data_v1beta.types import RunReportRequest, DateRange, Metric, Dimension
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+import threading
+import time
+
+# The Google client libraries take most of the app's import time, so they are
+# imported on first use (in the background refresher), not when the app loads.
 
 from datetime import datetime, timedelta
 
+try:
+    from dashboard_app.metrics import track_upstream
+except ImportError:
+    from metrics import track_upstream
+
 # Configuration
 KEY_FILE_PATH = 'dashboard_app/credentials.json'  # Put your downloaded JSON key here
 GA_PROPERTY_ID = os.environ.get('GA_PROPERTY_ID', 'YOUR_GA4_PROPERTY_ID')
 GSC_SITE_URL = os.environ.get('GSC_SITE_URL', 'sc-domain:yourdomain.com')
+REFRESH_INTERVAL = int(os.environ.get('GOOGLE_REFRESH_INTERVAL', 900))  # Seconds between background refreshes
+
+# Returned until the first background refresh has finished
+GA4_LOADING = {"active_users": "...", "total_users": "...", "status": "loading"}
+GSC_LOADING = {"clicks": "...", "impressions": "...", "status": "loading"}
+
+# Process-wide state: credentials and clients are created once and reused.
+# google-auth refreshes the access token on the shared credentials when it expires.
+_lock = threading.Lock()
+_credentials = None
+_credentials_loaded = False
+_ga4_client = None
+_gsc_service = None
+_results = {}
+_refresher = None
 
 def get_credentials():
     """
     Helper to get Google Credentials from Env Var (JSON string) or File.
+    Loaded once per process.
     """
-    # 1. Try Env Var with JSON content
+    global _credentials, _credentials_loaded
+    with _lock:
+        if not _credentials_loaded:
+            _credentials = _load_credentials()
+            _credentials_loaded = True
+        return _credentials
+
+def _load_credentials():
     json_creds = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS_JSON')
+    if not json_creds and not os.path.exists(KEY_FILE_PATH):
+        return None
+    try:
+        from google.oauth2 import service_account
+    except ImportError as e:
+        print(f"Google credentials found but google-auth is not installed: {e}")
+        return None
+
+    # 1. Try Env Var with JSON content
     if json_creds:
         try:
             info = json.loads(json_creds)
@@ -31,17 +69,64 @@ def get_credentials():
 
     return None
 
-def get_ga4_data():
+def set_clients(ga4_client=None, gsc_service=None):
+    """
+    Replaces the Google clients, e.g. with local stand-ins when testing.
+    Clears cached results so the next read fetches through the new clients.
+    """
+    global _ga4_client, _gsc_service
+    with _lock:
+        _ga4_client = ga4_client
+        _gsc_service = gsc_service
+        _results.clear()
+
+def _init_grpc_for_gevent():
+    # The GA4 client talks gRPC, whose I/O threads would block the event loop
+    # under gevent workers (SERVER_MODE=gevent) unless told to cooperate
+    try:
+        from gevent import monkey
+    except ImportError:
+        return
+    if monkey.is_module_patched('socket'):
+        from grpc.experimental import gevent as grpc_gevent
+        grpc_gevent.init_gevent()
+
+def get_ga4_client():
+    global _ga4_client
+    if _ga4_client is None:
+        credentials = get_credentials()
+        with _lock:
+            if _ga4_client is None:
+                _init_grpc_for_gevent()
+                from google.analytics.data_v1beta import BetaAnalyticsDataClient
+                _ga4_client = BetaAnalyticsDataClient(credentials=credentials)
+    return _ga4_client
+
+def get_gsc_service():
+    global _gsc_service
+    if _gsc_service is None:
+        credentials = get_credentials()
+        with _lock:
+            if _gsc_service is None:
+                from googleapiclient.discovery import build
+                # Use the discovery document bundled with google-api-python-client
+                # instead of downloading it on every cold start
+                _gsc_service = build('searchconsole', 'v1', credentials=credentials,
+                                     cache_discovery=False, static_discovery=True)
+    return _gsc_service
+
+def fetch_ga4_data():
     """
     Fetches active users and total users from Google Analytics 4.
     """
-    credentials = get_credentials()
-    if not credentials:
+    if _ga4_client is None and not get_credentials():
         # Return demo/placeholder data if not configured
         return {"active_users": "0", "total_users": "0", "status": "demo"}
 
     try:
-        client = BetaAnalyticsDataClient(credentials=credentials)
+        from google.analytics.data_v1beta.types import RunReportRequest, DateRange, Metric
+
+        client = get_ga4_client()
 
         request = RunReportRequest(
             property=f"properties/{GA_PROPERTY_ID}",
@@ -49,7 +134,9 @@ def get_ga4_data():
             metrics=[Metric(name="activeUsers"), Metric(name="totalUsers")],
         )
 
-        response = client.run_report(request=request)
+        with track_upstream('ga4', 'runReport') as call:
+            response = client.run_report(request=request)
+            call['status'] = 'ok'
 
         data = {"status": "live"}
         if response.rows:
@@ -58,23 +145,22 @@ def get_ga4_data():
         else:
             data['active_users'] = "0"
             data['total_users'] = "0"
-        
+
         return data
     except Exception as e:
         print(f"GA4 Error: {e}")
         return {"active_users": "Err", "total_users": "Err", "error": str(e)}
 
-def get_gsc_data():
+def fetch_gsc_data():
     """
     Fetches Clicks and Impressions from Google Search Console.
     """
-    credentials = get_credentials()
-    if not credentials:
+    if _gsc_service is None and not get_credentials():
         # Return demo/placeholder data if not configured
         return {"clicks": 0, "impressions": 0, "status": "demo"}
 
     try:
-        service = build('searchconsole', 'v1', credentials=credentials)
+        service = get_gsc_service()
 
         # Dynamic dates: Last 30 days
         end_date = datetime.now().strftime('%Y-%m-%d')
@@ -87,17 +173,19 @@ def get_gsc_data():
             'rowLimit': 100
         }
 
-        response = service.searchanalytics().query(siteUrl=GSC_SITE_URL, body=request).execute()
-        
+        with track_upstream('gsc', 'searchanalytics.query') as call:
+            response = service.searchanalytics().query(siteUrl=GSC_SITE_URL, body=request).execute()
+            call['status'] = 'ok'
+
         # Process response to sum up clicks/impressions
         total_clicks = 0
         total_impressions = 0
-        
+
         if 'rows' in response:
             for row in response['rows']:
                 total_clicks += row['clicks']
                 total_impressions += row['impressions']
-                
+
         return {
             "clicks": total_clicks,
             "impressions": total_impressions,
@@ -106,3 +194,41 @@ def get_gsc_data():
     except Exception as e:
         print(f"GSC Error: {e}")
         return {"clicks": 0, "impressions": 0, "error": str(e)}
+
+def refresh_all():
+    """
+    Fetches fresh GA4 and GSC numbers into the result cache.
+    """
+    _results['ga4'] = fetch_ga4_data()
+    _results['gsc'] = fetch_gsc_data()
+
+def _ensure_refresher():
+    global _refresher
+    with _lock:
+        if _refresher is not None and _refresher.is_alive():
+            return
+
+        def loop():
+            while True:
+                try:
+                    refresh_all()
+                except Exception as e:
+                    print(f"Google refresh error: {e}")
+                time.sleep(REFRESH_INTERVAL)
+
+        _refresher = threading.Thread(target=loop, name='google-refresh', daemon=True)
+        _refresher.start()
+
+def get_ga4_data():
+    """
+    Latest 30-day GA4 numbers. Served from the background-refreshed cache, never waits on Google.
+    """
+    _ensure_refresher()
+    return _results.get('ga4', GA4_LOADING)
+
+def get_gsc_data():
+    """
+    Latest 30-day Search Console numbers. Served from the background-refreshed cache, never waits on Google.
+    """
+    _ensure_refresher()
+    return _results.get('gsc', GSC_LOADING)
@@ -0,0 +1,106 @@
+import functools
+import gzip
+import hashlib
+import os
+
+from flask import Response, make_response, request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Response Compression Configuration
+COMPRESS_MIMETYPES = ('text/html', 'application/json')
+COMPRESS_MIN_SIZE = 500  # Below this the headers cost more than the bytes saved
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # Fast enough to run on every response
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates')
+
+
+def _build_id():
+    """
+    Identifies the deployed code, so a deploy invalidates every page ETag.
+    """
+    commit = os.environ.get('RENDER_GIT_COMMIT') or os.environ.get('VERCEL_GIT_COMMIT_SHA')
+    if commit:
+        return commit
+    digest = hashlib.sha1()
+    for directory in (os.path.dirname(os.path.abspath(__file__)), TEMPLATE_DIR):
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(('.py', '.html')):
+                stat = os.stat(os.path.join(directory, name))
+                digest.update(f"{name}:{stat.st_mtime_ns}:{stat.st_size}".encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+BUILD_ID = _build_id()
+
+
+def make_etag(*parts):
+    return hashlib.sha1(repr((BUILD_ID,) + parts).encode('utf-8')).hexdigest()[:24]
+
+
+def conditional(etag_fn, cache_control="private, no-cache"):
+    """
+    Decorator for views whose output is fully determined by `etag_fn()`.
+
+    A request whose If-None-Match matches gets a 304 before the view runs, so
+    no template is rendered and nothing is fetched. `etag_fn` returns None
+    to opt a request out (e.g. while the data still comes from the live API).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = etag_fn()
+            if etag is None:
+                return view(*args, **kwargs)
+
+            # Weak comparison: compressed responses carry a weak ETag
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = cache_control
+            return response
+        return wrapper
+    return decorator
+
+
+def compress_response(response):
+    """
+    after_request hook: brotli/gzip for HTML and JSON bodies the client accepts.
+    Streamed and file responses (exports, SSE, assets) are left alone.
+    """
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or 'Content-Encoding' in response.headers
+        or response.mimetype not in COMPRESS_MIMETYPES
+    ):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_SIZE:
+        return response
+
+    if brotli is not None and request.accept_encodings['br']:
+        encoding, body = 'br', brotli.compress(body, quality=BROTLI_QUALITY)
+    elif request.accept_encodings['gzip']:
+        encoding, body = 'gzip', gzip.compress(body, compresslevel=GZIP_LEVEL)
+    else:
+        return response
+
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The bytes differ per encoding, so the validator can only be weak
+        response.set_etag(etag, weak=True)
+    return response
@@ -0,0 +1,141 @@
+from datetime import date, timedelta
+
+# Listing Configuration
+PER_PAGE_DEFAULT = 20
+PER_PAGE_MAX = 100
+
+# Per resource: sort keys (-> mirror column, REST API orderby), filterable statuses,
+# whether date filters apply, and the fields requested from the REST API (_fields)
+LIST_OPTIONS = {
+    "products": {
+        "sorts": {"date": ("date_created", "date"), "name": ("name", "title"), "price": ("total", "price"), "id": ("id", "id")},
+        "default_sort": "date",
+        "statuses": ["publish", "draft", "pending", "private"],
+        "dates": True,
+        "fields": "id,name,price,stock_status,status,images,date_created",
+    },
+    "orders": {
+        "sorts": {"date": ("date_created", "date"), "id": ("id", "id")},
+        "default_sort": "date",
+        "statuses": ["pending", "processing", "on-hold", "completed", "cancelled", "refunded", "failed"],
+        "dates": True,
+        "fields": "id,billing,date_created,status,total",
+    },
+    "customers": {
+        "sorts": {"name": ("name", "name"), "registered": ("date_created", "registered_date"), "id": ("id", "id")},
+        "default_sort": "name",
+        "statuses": [],
+        "dates": False,
+        "fields": "id,first_name,last_name,email,date_created,orders_count,total_spent",
+    },
+}
+
+
+def _parse_int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _parse_date(value):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        return None
+
+
+def parse_list_args(resource, args):
+    """
+    Normalizes page/sort/filter query args for a list page, dropping anything invalid.
+    """
+    options = LIST_OPTIONS[resource]
+    sort = args.get('sort') if args.get('sort') in options['sorts'] else options['default_sort']
+    order = args.get('order') if args.get('order') in ('asc', 'desc') else None
+    status = args.get('status') if args.get('status') in options['statuses'] else None
+    after = _parse_date(args.get('after')) if options['dates'] else None
+    before = _parse_date(args.get('before')) if options['dates'] else None
+
+    return {
+        "page": max(1, _parse_int(args.get('page'), 1)),
+        "per_page": min(PER_PAGE_MAX, max(1, _parse_int(args.get('per_page'), PER_PAGE_DEFAULT))),
+        "sort": sort,
+        "order": order,
+        "search": (args.get('search') or '').strip() or None,
+        "status": status,
+        "after": after.isoformat() if after else None,
+        "before": before.isoformat() if before else None,
+    }
+
+
+def api_params(resource, query, page=None):
+    """
+    REST API query params for a normalized list query.
+    """
+    options = LIST_OPTIONS[resource]
+    params = {
+        "page": page or query['page'],
+        "per_page": query['per_page'],
+        "orderby": options['sorts'][query['sort']][1],
+        "_fields": options['fields'],
+    }
+    if query['order']:
+        params['order'] = query['order']
+    if query['search']:
+        params['search'] = query['search']
+    if query['status']:
+        params['status'] = query['status']
+    if query['after']:
+        params['after'] = f"{query['after']}T00:00:00"
+    if query['before']:
+        # "before" is inclusive in the UI, exclusive upstream
+        params['before'] = f"{date.fromisoformat(query['before']) + timedelta(days=1)}T00:00:00"
+    return params
+
+
+def mirror_filters(resource, query):
+    """
+    Mirror query kwargs (sort and filters) for a normalized list query.
+    """
+    before = query['before']
+    if before:
+        before = (date.fromisoformat(before) + timedelta(days=1)).isoformat()
+    return {
+        "order_by": LIST_OPTIONS[resource]['sorts'][query['sort']][0],
+        "descending": None if query['order'] is None else query['order'] == 'desc',
+        "search": query['search'],
+        "status": query['status'],
+        "after": query['after'],
+        "before": before,
+    }
+
+
+def fetch_page(resource, query, mirror, cache, executor=None):
+    """
+    Returns (records, total, total_pages) for a list page.
+
+    Served from the mirror once it has synced; otherwise from the cached REST
+    API, using its X-WP-Total/X-WP-TotalPages headers, with the next page
+    fetched into the cache in the background.
+    """
+    per_page = query['per_page']
+
+    if mirror.is_ready(resource):
+        records, total = mirror.query(resource, page=query['page'], per_page=per_page, **mirror_filters(resource, query))
+        return records, total, max(1, -(-total // per_page))
+
+    try:
+        response = cache.get(resource, params=api_params(resource, query))
+        if response.status_code != 200:
+            return [], 0, 1
+        records = response.json()
+        total = _parse_int(response.headers.get('X-WP-Total'), len(records))
+        total_pages = max(1, _parse_int(response.headers.get('X-WP-TotalPages'), 1))
+    except Exception as e:
+        print(f"List Error ({resource}): {e}")
+        return [], 0, 1
+
+    if executor is not None and query['page'] < total_pages:
+        executor.submit(cache.get, resource, api_params(resource, query, page=query['page'] + 1))
+
+    return records, total, total_pages
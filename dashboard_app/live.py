@@ -0,0 +1,137 @@
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+# Live Stats Configuration
+STATS_POLL_INTERVAL = int(os.environ.get('STATS_POLL_INTERVAL', 15))  # Seconds between upstream polls
+STREAM_MAX_DURATION = 300  # A stream closes after this long and the browser reconnects, freeing its worker thread
+HEARTBEAT_INTERVAL = 15  # Comment lines that keep proxies from closing idle streams
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stats_delta(old, new):
+    """
+    Fields of `new` that differ from `old`, with their status entries.
+    """
+    old = old or {}
+    old_status = old.get('status') or {}
+    new_status = new.get('status') or {}
+    delta = {}
+    status = {}
+    for name, value in new.items():
+        if name == 'status':
+            continue
+        if name not in old or old[name] != value or old_status.get(name) != new_status.get(name):
+            delta[name] = value
+            if name in new_status:
+                status[name] = new_status[name]
+    if delta and status:
+        delta['status'] = status
+    return delta
+
+
+class StatsBroadcaster:
+    """
+    Pushes stats changes to every connected dashboard from one shared poller.
+
+    Within a process, a single thread polls while at least one stream is
+    open. Across gunicorn workers, only the holder of the mirror's
+    'live-stats' lease calls `compute`; the other workers read the snapshot
+    it stores in the shared SQLite file. Upstream load therefore does not
+    grow with the number of open dashboards.
+    """
+
+    def __init__(self, compute, mirror, interval=STATS_POLL_INTERVAL):
+        self.compute = compute
+        self.mirror = mirror
+        self.interval = interval
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.snapshot = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.mirror.connection().execute(
+            "CREATE TABLE IF NOT EXISTS live_snapshot (name TEXT PRIMARY KEY, payload TEXT, updated REAL)"
+        )
+
+    def subscribe(self):
+        subscriber = queue.Queue(maxsize=100)
+        with self._lock:
+            self._subscribers.add(subscriber)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='live-stats', daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    # Nobody is watching: stop polling until the next subscriber
+                    self._thread = None
+                    return
+            try:
+                self._poll_once()
+            except Exception as e:
+                print(f"Live stats poll error: {e}")
+            time.sleep(self.interval)
+
+    def _poll_once(self):
+        conn = self.mirror.connection()
+        if self.mirror.acquire_lease('live-stats', self.owner, self.interval * 3):
+            snapshot = self.compute()
+            conn.execute(
+                "INSERT OR REPLACE INTO live_snapshot (name, payload, updated) VALUES ('stats', ?, ?)",
+                (json.dumps(snapshot), time.time()),
+            )
+        else:
+            row = conn.execute("SELECT payload FROM live_snapshot WHERE name = 'stats'").fetchone()
+            if row is None:
+                return
+            snapshot = json.loads(row[0])
+
+        delta = stats_delta(self.snapshot, snapshot)
+        self.snapshot = snapshot
+        if delta:
+            self._publish(delta)
+
+    def _publish(self, delta):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(delta)
+            except queue.Full:
+                # A stalled client; it gets the full snapshot when it reconnects
+                pass
+
+    def stream(self):
+        """
+        Generator of SSE lines: the current snapshot, then deltas as they happen.
+        """
+        subscriber = self.subscribe()
+        try:
+            yield "retry: 5000\n\n"
+            if self.snapshot is not None:
+                yield sse_event('snapshot', self.snapshot)
+
+            deadline = time.monotonic() + STREAM_MAX_DURATION
+            while time.monotonic() < deadline:
+                try:
+                    delta = subscriber.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield sse_event('delta', delta)
+        finally:
+            self.unsubscribe(subscriber)
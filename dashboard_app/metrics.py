@@ -0,0 +1,224 @@
+import bisect
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# Metrics Configuration
+# Every worker process writes its totals to <METRICS_DIR>/<pid>.json; /metrics sums the files
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'omaya_metrics'))
+METRICS_FLUSH_INTERVAL = 5  # Seconds between writes of this worker's file
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# name -> (type, help)
+METRICS = {
+    "dashboard_request_duration_seconds": ("histogram", "Time to produce a response, per route, method and status."),
+    "dashboard_requests_in_flight": ("gauge", "Requests being handled, per route."),
+    "dashboard_template_render_seconds": ("histogram", "Jinja render time, per template."),
+    "dashboard_upstream_duration_seconds": ("histogram", "Calls to WooCommerce, GA4, GSC and store images, per endpoint and status."),
+    "dashboard_upstream_in_flight": ("gauge", "Upstream calls in progress, per upstream."),
+    "dashboard_cache_requests_total": ("counter", "Cache lookups, per cache and result (hit, stale, miss, coalesced, fallback)."),
+    "dashboard_circuit_rejections_total": ("counter", "Upstream calls refused by an open circuit, per endpoint."),
+}
+
+
+class Registry:
+    """
+    This process's counters, gauges and histograms, keyed by (name, labels).
+    Recording is a dict update under a lock, cheap enough for every request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}  # -> [count per bucket..., count above the last bucket, sum]
+
+    def inc(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge_add(self, name, labels, delta):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.gauges[key] = self.gauges.get(key, 0) + delta
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect.bisect_left(LATENCY_BUCKETS, value)
+        with self._lock:
+            counts = self.histograms.get(key)
+            if counts is None:
+                counts = self.histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                "gauges": [[name, list(labels), value] for (name, labels), value in self.gauges.items()],
+                "histograms": [[name, list(labels), list(counts)] for (name, labels), counts in self.histograms.items()],
+            }
+
+
+registry = Registry()
+_flusher = None
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+
+def inc(name, labels, value=1):
+    _ensure_flusher()
+    registry.inc(name, labels, value)
+
+
+def gauge_add(name, labels, delta):
+    _ensure_flusher()
+    registry.gauge_add(name, labels, delta)
+
+
+def observe(name, labels, value):
+    _ensure_flusher()
+    registry.observe(name, labels, value)
+
+
+@contextmanager
+def track_upstream(upstream, endpoint):
+    """
+    Times one upstream call. The caller sets call['status'] (HTTP code or 'ok');
+    a call that raises is recorded as 'error'.
+    """
+    call = {"status": "error"}
+    gauge_add("dashboard_upstream_in_flight", {"upstream": upstream}, 1)
+    started = time.perf_counter()
+    try:
+        yield call
+    finally:
+        registry.gauge_add("dashboard_upstream_in_flight", {"upstream": upstream}, -1)
+        registry.observe(
+            "dashboard_upstream_duration_seconds",
+            {"upstream": upstream, "endpoint": endpoint, "status": str(call["status"])},
+            time.perf_counter() - started,
+        )
+
+
+def flush():
+    """
+    Writes this process's totals to its file in METRICS_DIR.
+    """
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f"{os.getpid()}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(registry.snapshot(), f)
+    os.replace(tmp, path)
+
+
+def _ensure_flusher():
+    global _flusher, _flusher_pid
+    # Threads don't survive fork, so check the pid too (gunicorn --preload)
+    if _flusher is not None and _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher is not None and _flusher_pid == os.getpid():
+            return
+
+        def loop():
+            while True:
+                time.sleep(METRICS_FLUSH_INTERVAL)
+                try:
+                    flush()
+                except OSError as e:
+                    print(f"Metrics flush error: {e}")
+
+        _flusher_pid = os.getpid()
+        _flusher = threading.Thread(target=loop, name='metrics-flush', daemon=True)
+        _flusher.start()
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+
+def collect():
+    """
+    Sums every worker's file. Counters and histograms of exited workers are
+    kept so totals never go backwards; their gauges are dropped.
+    """
+    flush()
+    counters, gauges, histograms = {}, {}, {}
+    for name in os.listdir(METRICS_DIR):
+        if not name.endswith('.json'):
+            continue
+        try:
+            pid = int(name[:-5])
+            with open(os.path.join(METRICS_DIR, name)) as f:
+                data = json.load(f)
+        except (ValueError, OSError):
+            continue
+
+        for metric, labels, value in data["counters"]:
+            key = (metric, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        if _alive(pid):
+            for metric, labels, value in data["gauges"]:
+                key = (metric, tuple(map(tuple, labels)))
+                gauges[key] = gauges.get(key, 0) + value
+        for metric, labels, counts in data["histograms"]:
+            key = (metric, tuple(map(tuple, labels)))
+            merged = histograms.get(key)
+            histograms[key] = counts if merged is None else [a + b for a, b in zip(merged, counts)]
+    return counters, gauges, histograms
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs, extra=()):
+    pairs = list(pairs) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def render():
+    """
+    All workers' metrics in the Prometheus text exposition format.
+    """
+    counters, gauges, histograms = collect()
+    lines = []
+    for name, (kind, help_text) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "counter":
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        elif kind == "gauge":
+            for (metric, labels), value in sorted(gauges.items()):
+                if metric == name:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        else:
+            for (metric, labels), counts in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels, [('le', bound)])} {cumulative}")
+                cumulative += counts[len(LATENCY_BUCKETS)]
+                lines.append(f"{name}_bucket{_labels(labels, [('le', '+Inf')])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {counts[-1]:.6f}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,409 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Mirror Configuration
+MIRROR_PATH = os.environ.get('MIRROR_DB_PATH', os.path.join(tempfile.gettempdir(), 'omaya_mirror.sqlite3'))
+SYNC_INTERVAL = int(os.environ.get('MIRROR_SYNC_INTERVAL', 300))  # Seconds between syncs, 0 disables the background sync
+FULL_SYNC_INTERVAL = int(os.environ.get('MIRROR_FULL_SYNC_INTERVAL', 6 * 3600))  # Full re-sync (catches deletions)
+SYNC_PAGE_SIZE = 100
+MODIFIED_OVERLAP = timedelta(seconds=60)  # Re-read a little before the high-water mark; upserts are idempotent
+
+# Mirrored resources and their default list ordering (matches the REST API defaults)
+RESOURCES = {
+    "products": {"order_by": "date_created", "descending": True, "incremental": True},
+    "orders": {"order_by": "date_created", "descending": True, "incremental": True},
+    "customers": {"order_by": "name", "descending": False, "incremental": False},  # No modified_after filter
+    "coupons": {"order_by": "date_created", "descending": True, "incremental": True},
+}
+
+# Statuses that never show up in the REST API's default listings
+HIDDEN_STATUSES = ('trash', 'auto-draft', 'checkout-draft')
+
+# Columns list queries may sort on
+SORTABLE_COLUMNS = ('id', 'name', 'email', 'total', 'date_created')
+
+# Order statuses counted as sales (same as WooCommerce's sales report)
+PAID_STATUSES = ('completed', 'processing', 'on-hold')
+
+
+def extract_fields(resource, record):
+    """
+    Returns the indexed columns kept alongside the raw JSON of a record.
+    """
+    if resource == 'products':
+        name, email, total, status = record.get('name'), None, record.get('price'), record.get('status')
+    elif resource == 'orders':
+        billing = record.get('billing') or {}
+        name = f"{billing.get('first_name', '')} {billing.get('last_name', '')}".strip()
+        email, total, status = billing.get('email'), record.get('total'), record.get('status')
+    elif resource == 'customers':
+        name = f"{record.get('first_name', '')} {record.get('last_name', '')}".strip()
+        email, total, status = record.get('email'), record.get('total_spent'), record.get('role')
+    else:
+        name, email, total, status = record.get('code'), None, record.get('amount'), record.get('status')
+
+    try:
+        total = float(total) if total not in (None, '') else None
+    except (TypeError, ValueError):
+        total = None
+
+    return {
+        "status": status,
+        "name": name,
+        "email": email,
+        "total": total,
+        "date_created": record.get('date_created'),
+        "date_modified_gmt": record.get('date_modified_gmt') or record.get('date_created_gmt'),
+    }
+
+
+class Mirror:
+    """
+    Local SQLite copy of the store's products, orders, customers and coupons.
+
+    One full sync fills it, then only records modified since the stored
+    high-water mark are pulled. Reads never touch the network.
+    """
+
+    def __init__(self, path=MIRROR_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._listeners = []
+        self._init_schema()
+
+    def _conn(self):
+        # One connection per thread; sqlite3 connections must not be shared across threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def connection(self):
+        """
+        The calling thread's connection. Listeners use it so their writes join the mirror's transaction.
+        """
+        return self._conn()
+
+    def _init_schema(self):
+        conn = self._conn()
+        for resource in RESOURCES:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {resource} (
+                    id INTEGER PRIMARY KEY,
+                    status TEXT,
+                    name TEXT,
+                    email TEXT,
+                    total REAL,
+                    date_created TEXT,
+                    date_modified_gmt TEXT,
+                    data TEXT NOT NULL
+                )
+            """)
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {resource}_date_created ON {resource} (date_created)")
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {resource}_status ON {resource} (status)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sync_state (
+                resource TEXT PRIMARY KEY,
+                high_water TEXT,
+                last_sync REAL,
+                last_full_sync REAL,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("CREATE TABLE IF NOT EXISTS lease (name TEXT PRIMARY KEY, owner TEXT, expires REAL)")
+
+    # --- Change listeners -------------------------------------------------
+
+    def add_listener(self, fn):
+        """
+        Registers fn(resource, record, previous) called for every upsert and delete.
+        record is None for deletes; previous is None for new records.
+        """
+        self._listeners.append(fn)
+
+    def _notify(self, resource, record, previous):
+        for fn in self._listeners:
+            try:
+                fn(resource, record, previous)
+            except Exception as e:
+                print(f"Mirror listener error ({resource}): {e}")
+
+    # --- Writes -----------------------------------------------------------
+
+    def upsert_many(self, resource, records):
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            changed = 0
+            for record in records:
+                data = json.dumps(record)
+                row = conn.execute(f"SELECT data FROM {resource} WHERE id = ?", (record['id'],)).fetchone()
+                if row is not None and row[0] == data:
+                    # Unchanged (e.g. re-read through the sync overlap window): keep the version
+                    continue
+                previous = json.loads(row[0]) if row is not None and self._listeners else None
+                fields = extract_fields(resource, record)
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {resource} "
+                    "(id, status, name, email, total, date_created, date_modified_gmt, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (record['id'], fields['status'], fields['name'], fields['email'], fields['total'],
+                     fields['date_created'], fields['date_modified_gmt'], data),
+                )
+                self._notify(resource, record, previous)
+                changed += 1
+            if changed:
+                self._bump_version(resource)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def upsert(self, resource, record):
+        self.upsert_many(resource, [record])
+
+    def delete(self, resource, record_id):
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            previous = self.get(resource, record_id)
+            conn.execute(f"DELETE FROM {resource} WHERE id = ?", (record_id,))
+            if previous is not None:
+                self._notify(resource, None, previous)
+                self._bump_version(resource)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _bump_version(self, resource):
+        self._conn().execute(
+            "INSERT INTO sync_state (resource, version) VALUES (?, 1) "
+            "ON CONFLICT(resource) DO UPDATE SET version = version + 1",
+            (resource,),
+        )
+
+    # --- Reads ------------------------------------------------------------
+
+    def get(self, resource, record_id):
+        row = self._conn().execute(f"SELECT data FROM {resource} WHERE id = ?", (record_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def list(self, resource, limit=20):
+        return self.query(resource, per_page=limit)[0]
+
+    def _where(self, status=None, after=None, before=None, search=None):
+        clauses = []
+        args = []
+        if status:
+            clauses.append("status = ?")
+            args.append(status)
+        else:
+            clauses.append(f"(status IS NULL OR status NOT IN ({', '.join('?' for _ in HIDDEN_STATUSES)}))")
+            args.extend(HIDDEN_STATUSES)
+        if after:
+            clauses.append("date_created >= ?")
+            args.append(after)
+        if before:
+            clauses.append("date_created < ?")
+            args.append(before)
+        if search:
+            like = f"%{search}%"
+            clauses.append("(name LIKE ? OR email LIKE ? OR CAST(id AS TEXT) = ?)")
+            args.extend([like, like, search.lstrip('#')])
+        return " AND ".join(clauses), args
+
+    def _order(self, resource, order_by, descending):
+        config = RESOURCES[resource]
+        order_by = order_by or config['order_by']
+        if order_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"Cannot sort {resource} by {order_by}")
+        descending = config['descending'] if descending is None else descending
+        direction = "DESC" if descending else "ASC"
+        return f"{order_by} {direction}, id {direction}"
+
+    def query(self, resource, page=1, per_page=20, order_by=None, descending=None,
+              search=None, status=None, after=None, before=None):
+        """
+        Filtered, sorted page of a resource. Returns (records, total matching).
+        """
+        where, args = self._where(status, after, before, search)
+        order = self._order(resource, order_by, descending)
+        conn = self._conn()
+        total = conn.execute(f"SELECT COUNT(*) FROM {resource} WHERE {where}", args).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT data FROM {resource} WHERE {where} ORDER BY {order} LIMIT ? OFFSET ?",
+            (*args, per_page, (page - 1) * per_page),
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows], total
+
+    def iter_query(self, resource, order_by=None, descending=None, search=None, status=None,
+                   after=None, before=None, chunk_size=500):
+        """
+        Streams every matching record with a single cursor, chunk_size rows at a time.
+        """
+        where, args = self._where(status, after, before, search)
+        order = self._order(resource, order_by, descending)
+        cursor = self._conn().execute(f"SELECT data FROM {resource} WHERE {where} ORDER BY {order}", args)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield json.loads(row[0])
+        finally:
+            cursor.close()
+
+    def count(self, resource):
+        placeholders = ", ".join("?" for _ in HIDDEN_STATUSES)
+        return self._conn().execute(
+            f"SELECT COUNT(*) FROM {resource} WHERE status IS NULL OR status NOT IN ({placeholders})",
+            HIDDEN_STATUSES,
+        ).fetchone()[0]
+
+    def sales_total(self, since):
+        """
+        Sum of paid order totals created on or after `since` (YYYY-MM-DD, store time).
+        """
+        placeholders = ", ".join("?" for _ in PAID_STATUSES)
+        total = self._conn().execute(
+            f"SELECT COALESCE(SUM(total), 0) FROM orders WHERE status IN ({placeholders}) AND date_created >= ?",
+            (*PAID_STATUSES, since),
+        ).fetchone()[0]
+        return f"{total:.2f}"
+
+    def get_state(self, resource):
+        row = self._conn().execute(
+            "SELECT high_water, last_sync, last_full_sync, version FROM sync_state WHERE resource = ?",
+            (resource,),
+        ).fetchone()
+        if row is None:
+            return {"high_water": None, "last_sync": None, "last_full_sync": None, "version": 0}
+        return {"high_water": row[0], "last_sync": row[1], "last_full_sync": row[2], "version": row[3]}
+
+    def is_ready(self, resource):
+        """
+        True once the resource has completed at least one full sync.
+        """
+        return self.get_state(resource)['last_full_sync'] is not None
+
+    # --- Sync -------------------------------------------------------------
+
+    def _set_state(self, resource, high_water, full):
+        now = time.time()
+        self._conn().execute(
+            "INSERT INTO sync_state (resource, high_water, last_sync, last_full_sync) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(resource) DO UPDATE SET high_water = excluded.high_water, last_sync = excluded.last_sync, "
+            "last_full_sync = COALESCE(excluded.last_full_sync, last_full_sync)",
+            (resource, high_water, now, now if full else None),
+        )
+
+    def sync_resource(self, client, resource, full=False):
+        """
+        Pulls changed records for one resource and records the new high-water mark.
+        Returns the number of records written.
+        """
+        state = self.get_state(resource)
+        due_full = state['last_full_sync'] is None or time.time() - state['last_full_sync'] > FULL_SYNC_INTERVAL
+        full = full or due_full
+        if not full and not RESOURCES[resource]['incremental']:
+            # Nothing to ask for between full syncs; webhooks keep these fresh
+            return 0
+
+        params = {"per_page": SYNC_PAGE_SIZE, "orderby": "id", "order": "asc"}
+        if not full and state['high_water']:
+            since = datetime.fromisoformat(state['high_water']) - MODIFIED_OVERLAP
+            params["modified_after"] = since.isoformat(timespec='seconds')
+            params["dates_are_gmt"] = "true"
+
+        high_water = state['high_water'] or ''
+        seen_ids = set()
+        written = 0
+        page = 1
+        while True:
+            params["page"] = page
+            response = client.get(resource, params=params)
+            if response.status_code != 200:
+                raise RuntimeError(f"Sync of {resource} failed on page {page}: {response.status_code}")
+
+            records = response.json()
+            if not records:
+                break
+            self.upsert_many(resource, records)
+            written += len(records)
+            for record in records:
+                seen_ids.add(record['id'])
+                high_water = max(high_water, record.get('date_modified_gmt') or '')
+
+            total_pages = int(response.headers.get('X-WP-TotalPages') or page)
+            if page >= total_pages:
+                break
+            page += 1
+
+        if full:
+            # Anything not returned by a full listing was deleted upstream
+            for (record_id,) in self._conn().execute(f"SELECT id FROM {resource}").fetchall():
+                if record_id not in seen_ids:
+                    self.delete(resource, record_id)
+
+        self._set_state(resource, high_water or None, full)
+        return written
+
+    def sync_all(self, client, full=False):
+        results = {}
+        for resource in RESOURCES:
+            try:
+                results[resource] = self.sync_resource(client, resource, full=full)
+            except Exception as e:
+                print(f"Mirror sync error ({resource}): {e}")
+                results[resource] = None
+        return results
+
+    # --- Cross-process lease ------------------------------------------------
+
+    def acquire_lease(self, name, owner, ttl):
+        """
+        Takes (or renews) a named lease so only one worker process runs a job.
+        """
+        now = time.time()
+        conn = self._conn()
+        conn.execute("INSERT OR IGNORE INTO lease (name, owner, expires) VALUES (?, '', 0)", (name,))
+        cursor = conn.execute(
+            "UPDATE lease SET owner = ?, expires = ? WHERE name = ? AND (owner = ? OR expires < ?)",
+            (owner, now + ttl, name, owner, now),
+        )
+        return cursor.rowcount == 1
+
+
+def start_background_sync(mirror, client, interval=SYNC_INTERVAL):
+    """
+    Runs mirror.sync_all() every `interval` seconds in a daemon thread.
+    Across gunicorn workers only the lease holder syncs.
+    """
+    if interval <= 0:
+        return None
+
+    owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+    def loop():
+        while True:
+            try:
+                if mirror.acquire_lease('sync', owner, interval * 2):
+                    mirror.sync_all(client)
+            except Exception as e:
+                print(f"Mirror sync loop error: {e}")
+            time.sleep(interval)
+
+    thread = threading.Thread(target=loop, name='mirror-sync', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,261 @@
+import json
+from datetime import date, timedelta
+
+try:
+    from dashboard_app.mirror import PAID_STATUSES
+except ImportError:
+    from mirror import PAID_STATUSES
+
+UNCATEGORIZED = (0, "Uncategorized")
+
+# Bumped whenever a rollup table is added or changes meaning; existing databases are rebuilt once
+ROLLUP_VERSION = "2"
+
+# Sales time series: bucket sizes, oldest first when coarsening, and the most points one response may hold
+SERIES_BUCKETS = ('hour', 'day', 'week', 'month')
+SERIES_MAX_POINTS = 1000
+
+
+class Reports:
+    """
+    Sales rollups (day x product, day x category, and sales per hour and per
+    day) kept in the mirror database.
+
+    Every order written to the mirror replaces that order's previous
+    contribution, so the buckets stay exact without recomputing from all
+    orders. A report for any date range only reads the daily buckets in
+    that range, however many orders the store has.
+    """
+
+    def __init__(self, mirror):
+        self.mirror = mirror
+        self._init_schema()
+        mirror.add_listener(self._on_change)
+        self.ensure_built()
+
+    def _init_schema(self):
+        conn = self.mirror.connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS order_contrib (
+                order_id INTEGER,
+                day TEXT,
+                product_id INTEGER,
+                product_name TEXT,
+                category_id INTEGER,
+                category_name TEXT,
+                quantity REAL,
+                revenue REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS order_contrib_order ON order_contrib (order_id)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rollup_product_day (
+                day TEXT, product_id INTEGER, name TEXT, quantity REAL, revenue REAL,
+                PRIMARY KEY (day, product_id)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS rollup_category_day (
+                day TEXT, category_id INTEGER, name TEXT, quantity REAL, revenue REAL,
+                PRIMARY KEY (day, category_id)
+            )
+        """)
+        conn.execute("CREATE TABLE IF NOT EXISTS order_sales (order_id INTEGER PRIMARY KEY, hour TEXT, total REAL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS rollup_sales_hour (hour TEXT PRIMARY KEY, orders INTEGER, revenue REAL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS rollup_sales_day (day TEXT PRIMARY KEY, orders INTEGER, revenue REAL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS rollup_state (name TEXT PRIMARY KEY, value TEXT)")
+
+    # --- Maintenance ------------------------------------------------------
+
+    def ensure_built(self):
+        """
+        Backfills the rollups from orders already in the mirror (first run only).
+        """
+        conn = self.mirror.connection()
+        built = "SELECT 1 FROM rollup_state WHERE name = 'built' AND value = ?"
+        if conn.execute(built, (ROLLUP_VERSION,)).fetchone():
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another worker may have built it while we waited for the lock
+            if not conn.execute(built, (ROLLUP_VERSION,)).fetchone():
+                for table in ('order_contrib', 'rollup_product_day', 'rollup_category_day',
+                              'order_sales', 'rollup_sales_hour', 'rollup_sales_day'):
+                    conn.execute(f"DELETE FROM {table}")
+                for (data,) in conn.execute("SELECT data FROM orders").fetchall():
+                    self._apply(conn, json.loads(data), None)
+                conn.execute("INSERT OR REPLACE INTO rollup_state (name, value) VALUES ('built', ?)", (ROLLUP_VERSION,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _on_change(self, resource, record, previous):
+        if resource != 'orders':
+            return
+        self._apply(self.mirror.connection(), record, previous)
+
+    def _apply(self, conn, order, previous):
+        order_id = (order or previous)['id']
+
+        # 1. Take the order's previous contribution out of the buckets
+        for day, product_id, category_id, quantity, revenue in conn.execute(
+            "SELECT day, product_id, category_id, quantity, revenue FROM order_contrib WHERE order_id = ?",
+            (order_id,),
+        ).fetchall():
+            conn.execute(
+                "UPDATE rollup_product_day SET quantity = quantity - ?, revenue = revenue - ? WHERE day = ? AND product_id = ?",
+                (quantity, revenue, day, product_id),
+            )
+            conn.execute(
+                "UPDATE rollup_category_day SET quantity = quantity - ?, revenue = revenue - ? WHERE day = ? AND category_id = ?",
+                (quantity, revenue, day, category_id),
+            )
+        conn.execute("DELETE FROM order_contrib WHERE order_id = ?", (order_id,))
+        row = conn.execute("SELECT hour, total FROM order_sales WHERE order_id = ?", (order_id,)).fetchone()
+        if row is not None:
+            hour, total = row
+            conn.execute("UPDATE rollup_sales_hour SET orders = orders - 1, revenue = revenue - ? WHERE hour = ?",
+                         (total, hour))
+            conn.execute("UPDATE rollup_sales_day SET orders = orders - 1, revenue = revenue - ? WHERE day = ?",
+                         (total, hour[:10]))
+            conn.execute("DELETE FROM order_sales WHERE order_id = ?", (order_id,))
+
+        # 2. Add the new contribution (only paid orders count as sales)
+        if not order or order.get('status') not in PAID_STATUSES or not order.get('date_created'):
+            return
+        day = order['date_created'][:10]
+        hour = order['date_created'][:13]
+        total = float(order.get('total') or 0)
+        conn.execute("INSERT INTO order_sales (order_id, hour, total) VALUES (?, ?, ?)", (order_id, hour, total))
+        conn.execute(
+            "INSERT INTO rollup_sales_hour (hour, orders, revenue) VALUES (?, 1, ?) "
+            "ON CONFLICT(hour) DO UPDATE SET orders = orders + 1, revenue = revenue + excluded.revenue",
+            (hour, total),
+        )
+        conn.execute(
+            "INSERT INTO rollup_sales_day (day, orders, revenue) VALUES (?, 1, ?) "
+            "ON CONFLICT(day) DO UPDATE SET orders = orders + 1, revenue = revenue + excluded.revenue",
+            (day, total),
+        )
+        for item in order.get('line_items') or []:
+            product_id = item.get('product_id') or 0
+            quantity = float(item.get('quantity') or 0)
+            revenue = float(item.get('total') or 0)
+            categories = self._categories(conn, product_id)
+            # Split the line between its categories so category totals add up to sales
+            share = 1.0 / len(categories)
+            for category_id, category_name in categories:
+                conn.execute(
+                    "INSERT INTO order_contrib VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (order_id, day, product_id, item.get('name'), category_id, category_name,
+                     quantity * share, revenue * share),
+                )
+                conn.execute(
+                    "INSERT INTO rollup_category_day (day, category_id, name, quantity, revenue) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT(day, category_id) DO UPDATE SET quantity = quantity + excluded.quantity, "
+                    "revenue = revenue + excluded.revenue, name = excluded.name",
+                    (day, category_id, category_name, quantity * share, revenue * share),
+                )
+            conn.execute(
+                "INSERT INTO rollup_product_day (day, product_id, name, quantity, revenue) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(day, product_id) DO UPDATE SET quantity = quantity + excluded.quantity, "
+                "revenue = revenue + excluded.revenue, name = excluded.name",
+                (day, product_id, item.get('name'), quantity, revenue),
+            )
+
+    def _categories(self, conn, product_id):
+        row = conn.execute("SELECT data FROM products WHERE id = ?", (product_id,)).fetchone()
+        categories = json.loads(row[0]).get('categories') if row else None
+        if not categories:
+            return [UNCATEGORIZED]
+        return [(c.get('id'), c.get('name')) for c in categories]
+
+    # --- Queries ----------------------------------------------------------
+
+    def sales_by_category(self, start, end):
+        """
+        [{"id", "name", "quantity", "revenue"}] for days start..end (inclusive, YYYY-MM-DD).
+        """
+        rows = self.mirror.connection().execute(
+            "SELECT category_id, MAX(name), SUM(quantity), SUM(revenue) FROM rollup_category_day "
+            "WHERE day BETWEEN ? AND ? GROUP BY category_id HAVING SUM(quantity) > 0 ORDER BY SUM(revenue) DESC",
+            (start, end),
+        ).fetchall()
+        return [{"id": r[0], "name": r[1], "quantity": round(r[2], 2), "revenue": round(r[3], 2)} for r in rows]
+
+    def top_products(self, start, end, limit=10):
+        rows = self.mirror.connection().execute(
+            "SELECT product_id, MAX(name), SUM(quantity), SUM(revenue) FROM rollup_product_day "
+            "WHERE day BETWEEN ? AND ? GROUP BY product_id HAVING SUM(quantity) > 0 "
+            "ORDER BY SUM(quantity) DESC, SUM(revenue) DESC LIMIT ?",
+            (start, end, limit),
+        ).fetchall()
+        return [{"id": r[0], "name": r[1], "quantity": round(r[2], 2), "revenue": round(r[3], 2)} for r in rows]
+
+    def sales_series(self, bucket, start, end):
+        """
+        Sales per bucket for days start..end (inclusive, YYYY-MM-DD), zero-filled:
+        {"bucket", "labels", "orders", "revenue", "aov"}. A bucket that would
+        give more than SERIES_MAX_POINTS points is coarsened to the next size.
+        """
+        while bucket != SERIES_BUCKETS[-1] and len(bucket_labels(bucket, start, end, SERIES_MAX_POINTS + 1)) > SERIES_MAX_POINTS:
+            bucket = SERIES_BUCKETS[SERIES_BUCKETS.index(bucket) + 1]
+
+        conn = self.mirror.connection()
+        if bucket == 'hour':
+            rows = conn.execute(
+                "SELECT hour, orders, revenue FROM rollup_sales_hour WHERE hour BETWEEN ? AND ? AND orders > 0",
+                (f"{start}T00", f"{end}T23"),
+            ).fetchall()
+        else:
+            key = {
+                "day": "day",
+                "week": "date(day, '-6 days', 'weekday 1')",  # Monday starting the ISO week
+                "month": "substr(day, 1, 7)",
+            }[bucket]
+            rows = conn.execute(
+                f"SELECT {key}, SUM(orders), SUM(revenue) FROM rollup_sales_day "
+                "WHERE day BETWEEN ? AND ? GROUP BY 1 HAVING SUM(orders) > 0",
+                (start, end),
+            ).fetchall()
+
+        found = {label: (orders, revenue) for label, orders, revenue in rows}
+        labels = bucket_labels(bucket, start, end)
+        series = {"bucket": bucket, "labels": labels, "orders": [], "revenue": [], "aov": []}
+        for label in labels:
+            orders, revenue = found.get(label, (0, 0.0))
+            series["orders"].append(orders)
+            series["revenue"].append(round(revenue, 2))
+            series["aov"].append(round(revenue / orders, 2) if orders else 0)
+        return series
+
+
+def bucket_labels(bucket, start, end, limit=None):
+    """
+    Every bucket label between start and end (YYYY-MM-DD), in the format sales_series keys them by.
+    """
+    first, last = date.fromisoformat(start), date.fromisoformat(end)
+    labels = []
+    if bucket == 'hour':
+        day = first
+        while day <= last and (limit is None or len(labels) < limit):
+            labels.extend(f"{day.isoformat()}T{h:02d}" for h in range(24))
+            day += timedelta(days=1)
+    elif bucket == 'day':
+        day = first
+        while day <= last and (limit is None or len(labels) < limit):
+            labels.append(day.isoformat())
+            day += timedelta(days=1)
+    elif bucket == 'week':
+        day = first - timedelta(days=first.weekday())
+        while day <= last and (limit is None or len(labels) < limit):
+            labels.append(day.isoformat())
+            day += timedelta(days=7)
+    else:
+        year, month = first.year, first.month
+        while (year, month) <= (last.year, last.month) and (limit is None or len(labels) < limit):
+            labels.append(f"{year:04d}-{month:02d}")
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return labels
@@ -0,0 +1,169 @@
+import os
+import threading
+import time
+
+# Circuit Breaker Configuration
+BREAKER_FAILURES = int(os.environ.get('WC_BREAKER_FAILURES', 5))  # Consecutive failures that open the circuit
+BREAKER_RESET = float(os.environ.get('WC_BREAKER_RESET', 30))  # Seconds an open circuit fails fast before one trial call
+
+
+def endpoint_label(endpoint):
+    """
+    An endpoint with record ids collapsed ("orders/123" -> "orders/{id}"),
+    used to key circuits and label metrics.
+    """
+    path = endpoint.split('?', 1)[0].strip('/')
+    return '/'.join('{id}' if part.isdigit() else part for part in path.split('/'))
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an upstream whose circuit is open.
+    """
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one: the first caller
+    runs the function, the others wait for and share its result (or error).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        Returns (result, shared); shared is True for callers that waited on another's call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event(), "result": None, "error": None}
+
+        if not leader:
+            call["done"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"], True
+
+        try:
+            call["result"] = fn()
+            return call["result"], False
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call["done"].set()
+
+
+class CircuitBreaker:
+    """
+    Per-process breaker for one upstream endpoint.
+
+    Closed: calls go through. After `failures` consecutive failures it opens
+    and `allow()` is False for `reset` seconds. Then one trial call is let
+    through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failures=BREAKER_FAILURES, reset=BREAKER_RESET):
+        self.failures = failures
+        self.reset = reset
+        self._lock = threading.Lock()
+        self._consecutive = 0
+        self._opened_at = None
+        self._trial = False
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        return "half-open" if self._trial or time.monotonic() - self._opened_at >= self.reset else "open"
+
+    def retry_in(self):
+        if self._opened_at is None:
+            return 0
+        return max(0, self.reset - (time.monotonic() - self._opened_at))
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < self.reset:
+                return False
+            self._trial = True
+            return True
+
+    def release(self):
+        """
+        The allowed call never reached the endpoint: no outcome, and a half-open trial can run again.
+        """
+        with self._lock:
+            self._trial = False
+
+    def record(self, success):
+        with self._lock:
+            self._trial = False
+            if success:
+                self._consecutive = 0
+                self._opened_at = None
+                return
+            self._consecutive += 1
+            if self._opened_at is not None or self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+
+
+class BreakerRegistry:
+    """
+    One CircuitBreaker per endpoint label, created on first use.
+    """
+
+    def __init__(self, failures=BREAKER_FAILURES, reset=BREAKER_RESET):
+        self.failures = failures
+        self.reset = reset
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def get(self, endpoint):
+        label = endpoint_label(endpoint)
+        with self._lock:
+            breaker = self._breakers.get(label)
+            if breaker is None:
+                breaker = self._breakers[label] = CircuitBreaker(self.failures, self.reset)
+            return breaker
+
+    def states(self):
+        with self._lock:
+            return {label: breaker.state for label, breaker in self._breakers.items()}
+
+
+class TokenBucket:
+    """
+    Rate limiter: allows `rate` calls per second on average with bursts of
+    up to `burst`. acquire() waits for a token (at most `timeout` seconds).
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst or max(1, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
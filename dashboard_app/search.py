@@ -0,0 +1,174 @@
+import json
+import re
+import sqlite3
+
+try:
+    from dashboard_app.mirror import HIDDEN_STATUSES
+except ImportError:
+    from mirror import HIDDEN_STATUSES
+
+# Bumped whenever what is indexed (or how it is normalized) changes; existing indexes are rebuilt once
+SEARCH_VERSION = "1"
+
+# Searchable resources; the position is part of each entry's rowid (id * len + position)
+SEARCH_RESOURCES = ('products', 'orders', 'customers')
+SEARCH_LIMIT = 8
+
+# Arabic orthographic variants folded to one form, so "ميلفيه" finds "ميلفية" and "منديّ" finds "مندي"
+ARABIC_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]')  # Tashkeel, Quranic marks, tatweel
+ARABIC_FOLD = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ة': 'ه',
+    'ى': 'ي',
+    'ؤ': 'و',
+    'ئ': 'ي',
+    '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4', '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9',
+    '۰': '0', '۱': '1', '۲': '2', '۳': '3', '۴': '4', '۵': '5', '۶': '6', '۷': '7', '۸': '8', '۹': '9',
+})
+TOKEN = re.compile(r'\w+')
+
+
+def normalize(text):
+    """
+    Search form of a text: lowercased, Arabic diacritics and tatweel dropped,
+    hamza/alef, taa marbuta and alef maqsura variants folded, Arabic digits as ASCII.
+    """
+    return ARABIC_DIACRITICS.sub('', str(text).casefold()).translate(ARABIC_FOLD)
+
+
+def document(resource, record):
+    """
+    (label, detail, searchable text) for one record, or None when it should not be searchable.
+    """
+    if record.get('status') in HIDDEN_STATUSES:
+        return None
+
+    if resource == 'products':
+        categories = [c.get('name', '') for c in record.get('categories') or []]
+        label = record.get('name') or f"Product #{record['id']}"
+        detail = " · ".join(filter(None, [f"{record['price']} SAR" if record.get('price') else None] + categories))
+        terms = [label, record.get('sku'), *categories]
+    elif resource == 'orders':
+        billing = record.get('billing') or {}
+        name = f"{billing.get('first_name', '')} {billing.get('last_name', '')}".strip()
+        label = f"Order #{record['id']}"
+        detail = " · ".join(filter(None, [name, f"{record.get('total')} {record.get('currency', '')}".strip(),
+                                          record.get('status')]))
+        terms = [name, billing.get('email'), billing.get('phone'),
+                 *(item.get('name') for item in record.get('line_items') or [])]
+    else:
+        label = f"{record.get('first_name', '')} {record.get('last_name', '')}".strip() or record.get('email') or f"Customer #{record['id']}"
+        detail = record.get('email') or ''
+        terms = [label, record.get('email'), record.get('username'), (record.get('billing') or {}).get('phone')]
+
+    terms.append(str(record['id']))
+    return label, detail, normalize(" ".join(t for t in terms if t))
+
+
+def match_expression(query):
+    """
+    FTS5 query for what the user has typed so far: every word must match as a prefix.
+    """
+    tokens = TOKEN.findall(normalize(query))
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+class SearchIndex:
+    """
+    Full-text index (SQLite FTS5) over products, orders and customers, kept
+    in the mirror database and updated as records are written to it.
+
+    Text is normalized the same way when indexed and when searched, and
+    every word of the query matches as a prefix, which suits type-ahead.
+    """
+
+    def __init__(self, mirror):
+        self.mirror = mirror
+        self.enabled = self._init_schema()
+        if self.enabled:
+            mirror.add_listener(self._on_change)
+            self.ensure_built()
+
+    def _init_schema(self):
+        conn = self.mirror.connection()
+        try:
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+                    resource UNINDEXED, record_id UNINDEXED, label UNINDEXED, detail UNINDEXED, terms,
+                    tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3'
+                )
+            """)
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5
+            print(f"Search index disabled: {e}")
+            return False
+        conn.execute("CREATE TABLE IF NOT EXISTS search_state (name TEXT PRIMARY KEY, value TEXT)")
+        return True
+
+    # --- Maintenance ------------------------------------------------------
+
+    def ensure_built(self):
+        """
+        Indexes the records already in the mirror (first run, or after SEARCH_VERSION changes).
+        """
+        conn = self.mirror.connection()
+        built = "SELECT 1 FROM search_state WHERE name = 'built' AND value = ?"
+        if conn.execute(built, (SEARCH_VERSION,)).fetchone():
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another worker may have built it while we waited for the lock
+            if not conn.execute(built, (SEARCH_VERSION,)).fetchone():
+                conn.execute("DELETE FROM search_index")
+                for resource in SEARCH_RESOURCES:
+                    for (data,) in conn.execute(f"SELECT data FROM {resource}").fetchall():
+                        self._apply(conn, resource, json.loads(data))
+                conn.execute("INSERT OR REPLACE INTO search_state (name, value) VALUES ('built', ?)", (SEARCH_VERSION,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _on_change(self, resource, record, previous):
+        if resource not in SEARCH_RESOURCES:
+            return
+        conn = self.mirror.connection()
+        if record is None:
+            conn.execute("DELETE FROM search_index WHERE rowid = ?", (self._rowid(resource, previous['id']),))
+        else:
+            self._apply(conn, resource, record)
+
+    def _rowid(self, resource, record_id):
+        return int(record_id) * len(SEARCH_RESOURCES) + SEARCH_RESOURCES.index(resource)
+
+    def _apply(self, conn, resource, record):
+        rowid = self._rowid(resource, record['id'])
+        conn.execute("DELETE FROM search_index WHERE rowid = ?", (rowid,))
+        doc = document(resource, record)
+        if doc is not None:
+            conn.execute(
+                "INSERT INTO search_index (rowid, resource, record_id, label, detail, terms) VALUES (?, ?, ?, ?, ?, ?)",
+                (rowid, resource, record['id'], *doc),
+            )
+
+    # --- Reads ------------------------------------------------------------
+
+    def search(self, query, resource=None, limit=SEARCH_LIMIT):
+        """
+        Best matches for `query`, optionally of one resource: [{type, id, label, detail}], best first.
+        """
+        expression = match_expression(query)
+        if not self.enabled or not expression:
+            return []
+        sql = "SELECT resource, record_id, label, detail FROM search_index WHERE search_index MATCH ?"
+        args = [expression]
+        if resource:
+            sql += " AND resource = ?"
+            args.append(resource)
+        sql += " ORDER BY bm25(search_index) LIMIT ?"
+        args.append(limit)
+        return [
+            {"type": row[0], "id": row[1], "label": row[2], "detail": row[3]}
+            for row in self.mirror.connection().execute(sql, args).fetchall()
+        ]
@@ -0,0 +1,174 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+
+from flask import abort, request, send_file, url_for
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Static Asset Configuration
+ASSETS_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+ASSETS_BUILD = os.environ.get(
+    'ASSETS_BUILD_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets_build')
+)
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 10
+COMPRESSIBLE = ('.css', '.js', '.map', '.json', '.svg', '.txt', '.html', '.ttf', '.eot', '.ico')
+MIN_COMPRESS_SIZE = 1024  # Smaller files don't gain enough to be worth a second lookup
+IMMUTABLE_MAX_AGE = 31536000  # Fingerprinted names change whenever the content does
+MUTABLE_MAX_AGE = 3600  # Plain names, still referenced relatively from inside vendor bundles
+
+# (Accept-Encoding token, file suffix), best first
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+mimetypes.add_type('font/woff2', '.woff2')
+mimetypes.add_type('font/woff', '.woff')
+
+
+def fingerprint(path, content):
+    root, ext = posixpath.splitext(path)
+    return f"{root}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}{ext}"
+
+
+def rewrite_css_urls(path, content, manifest):
+    """
+    Points url(...) references in a stylesheet at the fingerprinted files.
+    """
+    base = posixpath.dirname(path)
+
+    def replace(match):
+        quote, ref = match.group(1), match.group(2).strip()
+        if ref.startswith(('data:', 'http:', 'https:', '//', '#', '/')):
+            return match.group(0)
+        # Keep ?#iefix style suffixes that font declarations rely on
+        target = re.split(r'[?#]', ref, maxsplit=1)[0]
+        suffix = ref[len(target):]
+        hashed = manifest.get(posixpath.normpath(posixpath.join(base, target)))
+        if hashed is None:
+            return match.group(0)
+        return f"url({quote}{posixpath.relpath(hashed, base or '.')}{suffix}{quote})"
+
+    text = content.decode('utf-8')
+    return CSS_URL.sub(replace, text).encode('utf-8')
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def _write_compressed(path, content):
+    if not path.endswith(COMPRESSIBLE) or len(content) < MIN_COMPRESS_SIZE:
+        return
+    variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.append(('.br', brotli.compress(content, quality=11)))
+    for suffix, compressed in variants:
+        if len(compressed) < len(content):
+            _write(path + suffix, compressed)
+
+
+def build(source=ASSETS_SOURCE, dest=ASSETS_BUILD):
+    """
+    Copies the asset tree into `dest` under both its plain and fingerprinted
+    names, with .gz (and .br, when brotli is installed) next to each
+    compressible file, and writes a manifest mapping plain to fingerprinted
+    paths. Stylesheets are processed last so their url() references can be
+    rewritten to fingerprinted fonts and images.
+    """
+    paths = []
+    for root, _, files in os.walk(source):
+        for name in files:
+            paths.append(os.path.relpath(os.path.join(root, name), source).replace(os.sep, '/'))
+    paths.sort(key=lambda p: (p.endswith('.css'), p))
+
+    # Build next to the live directory and swap, so running workers never see half a tree
+    staging = dest + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    manifest = {}
+    for path in paths:
+        with open(os.path.join(source, path), 'rb') as f:
+            content = f.read()
+        if path.endswith('.css'):
+            content = rewrite_css_urls(path, content, manifest)
+        hashed = fingerprint(path, content)
+        manifest[path] = hashed
+        for name in (path, hashed):
+            target = os.path.join(staging, name)
+            _write(target, content)
+            _write_compressed(target, content)
+
+    _write(os.path.join(staging, MANIFEST_NAME), json.dumps(manifest, indent=1, sort_keys=True).encode('utf-8'))
+    shutil.rmtree(dest, ignore_errors=True)
+    os.rename(staging, dest)
+    return manifest
+
+
+_manifest = None
+_fingerprinted = frozenset()
+
+
+def load_manifest():
+    """
+    The build manifest, or {} when `build_assets.py` hasn't been run (assets are then served from source).
+    """
+    global _manifest, _fingerprinted
+    if _manifest is None:
+        try:
+            with open(os.path.join(ASSETS_BUILD, MANIFEST_NAME)) as f:
+                _manifest = json.load(f)
+        except (OSError, ValueError):
+            _manifest = {}
+        _fingerprinted = frozenset(_manifest.values())
+    return _manifest
+
+
+def asset_url(path):
+    """
+    URL of an asset under assets/, fingerprinted when the build manifest knows it.
+    """
+    return url_for('assets', filename=load_manifest().get(path, path))
+
+
+def send_asset(filename):
+    manifest = load_manifest()
+    root = ASSETS_BUILD if manifest else ASSETS_SOURCE
+    path = safe_join(root, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    encoding = None
+    served = path
+    for token, suffix in ENCODINGS:
+        if request.accept_encodings[token] and os.path.isfile(path + suffix):
+            encoding = token
+            served = path + suffix
+            break
+
+    immutable = filename in _fingerprinted
+    response = send_file(
+        served,
+        mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream',
+        conditional=True,
+        max_age=IMMUTABLE_MAX_AGE if immutable else MUTABLE_MAX_AGE,
+    )
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if filename.endswith(COMPRESSIBLE):
+        response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    if immutable:
+        response.cache_control.immutable = True
+    return response
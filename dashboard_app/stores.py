@@ -0,0 +1,136 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+try:
+    from dashboard_app.cache import make_cache
+    from dashboard_app.resilience import TokenBucket
+    from dashboard_app.transport import POOL_SIZE, PooledAPI, make_session
+except ImportError:
+    from cache import make_cache
+    from resilience import TokenBucket
+    from transport import POOL_SIZE, PooledAPI, make_session
+
+# Store Registry Configuration
+# WC_STORES: JSON list of stores, e.g.
+#   [{"id": "cakes", "name": "Omaya Cakes", "url": "https://...", "consumer_key": "ck_...",
+#     "consumer_secret": "cs_...", "currency": "SAR", "rate_limit": 5, "pool_size": 8}]
+# (or WC_STORES_FILE pointing at a file with the same JSON). The first store is the primary one,
+# shown on the regular pages and kept in the local mirror. Without either, the primary store
+# comes from WC_URL / WC_CONSUMER_KEY / WC_CONSUMER_SECRET.
+DEFAULT_RATE_LIMIT = float(os.environ.get('WC_RATE_LIMIT', 10))  # Calls per second per store, per worker
+DEFAULT_CURRENCY = 'SAR'
+SUMMARY_DEADLINE = 5  # Seconds a combined view waits for the slowest store
+
+
+class Store:
+    """
+    One WooCommerce store with its own connection pool, rate limit and cache namespace.
+    """
+
+    def __init__(self, store_id, name, url, consumer_key, consumer_secret, currency=DEFAULT_CURRENCY,
+                 rate_limit=DEFAULT_RATE_LIMIT, pool_size=POOL_SIZE, namespace=None):
+        self.id = store_id
+        self.name = name or store_id
+        self.url = url
+        self.currency = currency
+        self.client = PooledAPI(
+            url=url,
+            consumer_key=consumer_key,
+            consumer_secret=consumer_secret,
+            version="wc/v3",
+            timeout=20,
+            session=make_session(pool_size=pool_size, read_retries=0),
+            rate_limiter=TokenBucket(rate_limit) if rate_limit else None,
+        )
+        self.cache = make_cache(self.client, namespace=namespace)
+
+    def summary(self):
+        """
+        {"orders", "sales"} from the store's (cached) REST API: order count and this year's sales.
+        """
+        orders = self.cache.get("orders", params={"per_page": 1})
+        sales = self.cache.get("reports/sales", params={"period": "year"})
+        for response in (orders, sales):
+            if response.status_code != 200:
+                raise RuntimeError(f"{self.id} returned {response.status_code}")
+        totals = sales.json()
+        return {
+            "orders": int(orders.headers.get('X-WP-Total') or 0),
+            "sales": float(totals[0]['total_sales']) if totals else 0.0,
+        }
+
+
+class StoreRegistry:
+    """
+    The configured stores, plus concurrent fan-out for views that combine them.
+    """
+
+    def __init__(self, stores):
+        if not stores:
+            raise ValueError("at least one store is required")
+        self.stores = {store.id: store for store in stores}
+        self.primary = stores[0]
+        # Enough threads for every store to be queried at once
+        self._executor = ThreadPoolExecutor(max_workers=max(4, len(stores) * 2))
+
+    def __iter__(self):
+        return iter(self.stores.values())
+
+    def __len__(self):
+        return len(self.stores)
+
+    def get(self, store_id):
+        return self.stores.get(store_id)
+
+    def fan_out(self, fn, deadline=SUMMARY_DEADLINE):
+        """
+        Runs fn(store) for every store concurrently. Returns {store_id: (result, status)}
+        with status ok/timeout/error; the total wait is bounded by `deadline`.
+        """
+        started = time.monotonic()
+        futures = {store.id: self._executor.submit(fn, store) for store in self}
+        results = {}
+        for store_id, future in futures.items():
+            try:
+                results[store_id] = (future.result(timeout=max(0, deadline - (time.monotonic() - started))), "ok")
+            except FutureTimeoutError:
+                results[store_id] = (None, "timeout")
+            except Exception as e:
+                print(f"Store Error ({store_id}): {e}")
+                results[store_id] = (None, "error")
+        return results
+
+
+def load_store_configs(default_url, default_key, default_secret):
+    raw = os.environ.get('WC_STORES')
+    path = os.environ.get('WC_STORES_FILE')
+    if not raw and path:
+        with open(path) as f:
+            raw = f.read()
+    if raw:
+        return json.loads(raw)
+    return [{"id": "main", "name": "Main Store", "url": default_url,
+             "consumer_key": default_key, "consumer_secret": default_secret}]
+
+
+def make_registry(default_url, default_key, default_secret):
+    """
+    Builds the store registry from WC_STORES / WC_STORES_FILE, or the single store given.
+    """
+    stores = []
+    for index, config in enumerate(load_store_configs(default_url, default_key, default_secret)):
+        stores.append(Store(
+            store_id=config['id'],
+            name=config.get('name'),
+            url=config['url'],
+            consumer_key=config['consumer_key'],
+            consumer_secret=config['consumer_secret'],
+            currency=config.get('currency', DEFAULT_CURRENCY),
+            rate_limit=config.get('rate_limit', DEFAULT_RATE_LIMIT),
+            pool_size=config.get('pool_size', POOL_SIZE),
+            # The primary store keeps the unprefixed keys that webhooks invalidate
+            namespace=None if index == 0 else config['id'],
+        ))
+    return StoreRegistry(stores)
@@ -0,0 +1,204 @@
+import hashlib
+import importlib.util
+import io
+import os
+import tempfile
+import threading
+from urllib.parse import urljoin, urlparse
+
+# Without Pillow the dashboard links the original images instead.
+# Pillow itself is imported on the first resize, not at app start.
+THUMBNAILS_ENABLED = importlib.util.find_spec('PIL') is not None
+
+try:
+    from dashboard_app.metrics import inc, track_upstream
+    from dashboard_app.transport import make_session
+except ImportError:
+    from metrics import inc, track_upstream
+    from transport import make_session
+
+# Thumbnail Configuration
+THUMB_CACHE_PATH = os.environ.get('THUMB_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'omaya_thumbs'))
+THUMB_CACHE_MAX_BYTES = int(os.environ.get('THUMB_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+THUMB_SIZES = (64, 128, 256)  # Square edge in pixels; anything else is rounded up to the next size
+THUMB_FORMATS = {"webp": "image/webp", "jpeg": "image/jpeg"}
+THUMB_QUALITY = 80
+SOURCE_TIMEOUT = 10
+SOURCE_MAX_BYTES = 20 * 1024 * 1024
+SOURCE_MAX_REDIRECTS = 3  # Each hop must stay on an allowed host
+THUMB_MAX_AGE = 7 * 24 * 3600  # Store image URLs change when the image does
+RESCAN_EVERY = 50  # Writes between directory scans (other workers write to the same cache)
+
+
+class ThumbnailError(Exception):
+    """
+    The source image could not be fetched or decoded.
+    """
+
+
+def thumb_size(requested):
+    for size in THUMB_SIZES:
+        if requested <= size:
+            return size
+    return THUMB_SIZES[-1]
+
+
+def thumb_key(src, size, fmt):
+    """
+    Cache file name and ETag of one variant.
+    """
+    return hashlib.sha256(f"{src}|{size}|{fmt}".encode('utf-8')).hexdigest()[:32]
+
+
+class ThumbnailCache:
+    """
+    Resized product images on disk, bounded to `max_bytes` with LRU eviction.
+
+    A hit bumps the file's mtime; when the directory grows past the limit the
+    least recently used files are deleted until it is back under 90%. The
+    directory can be shared by every gunicorn worker on the host.
+    """
+
+    def __init__(self, allowed_hosts, path=THUMB_CACHE_PATH, max_bytes=THUMB_CACHE_MAX_BYTES):
+        self.allowed_hosts = {h.lower() for h in allowed_hosts if h}
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._bytes = None
+        self._writes = 0
+        # Own pool, without read-timeout retries: a slow image fails once and the page links the original
+        self.session = make_session(read_retries=0)
+        os.makedirs(path, exist_ok=True)
+
+    def allowed(self, src):
+        """
+        Only images hosted by the store are proxied.
+        """
+        parsed = urlparse(src or '')
+        return parsed.scheme in ('http', 'https') and (parsed.hostname or '').lower() in self.allowed_hosts
+
+    def get(self, src, size, fmt):
+        """
+        Path of the cached variant, fetching and resizing the source on a miss.
+        Concurrent misses for the same variant share one fetch.
+        """
+        key = thumb_key(src, size, fmt)
+        path = os.path.join(self.path, f"{key}.{fmt}")
+        if os.path.exists(path):
+            try:
+                os.utime(path)
+                inc("dashboard_cache_requests_total", {"cache": "thumbnails", "result": "hit"})
+                return key, path
+            except OSError:
+                pass  # Evicted by another worker in between
+
+        inc("dashboard_cache_requests_total", {"cache": "thumbnails", "result": "miss"})
+        with self._lock:
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+        if not leader:
+            event.wait(SOURCE_TIMEOUT * 2)
+            if os.path.exists(path):
+                return key, path
+            raise ThumbnailError("thumbnail generation failed")
+
+        try:
+            content = self._render(self._fetch(src), size, fmt)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(content)
+            os.replace(tmp, path)
+            self._account(len(content))
+            return key, path
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def _fetch(self, src):
+        try:
+            with track_upstream('store', 'images') as call:
+                url = src
+                for _ in range(SOURCE_MAX_REDIRECTS + 1):
+                    # Redirects are followed here, so every hop is checked against the allowed hosts
+                    response = self.session.get(url, timeout=SOURCE_TIMEOUT, stream=True, allow_redirects=False)
+                    call['status'] = response.status_code
+                    if not response.is_redirect:
+                        break
+                    response.close()
+                    url = urljoin(url, response.headers['Location'])
+                    if not self.allowed(url):
+                        raise ThumbnailError(f"source redirects to a host that is not allowed: {urlparse(url).hostname}")
+                else:
+                    raise ThumbnailError("source redirects too many times")
+                if response.status_code != 200:
+                    raise ThumbnailError(f"source returned {response.status_code}")
+                body = io.BytesIO()
+                for chunk in response.iter_content(64 * 1024):
+                    body.write(chunk)
+                    if body.tell() > SOURCE_MAX_BYTES:
+                        raise ThumbnailError("source image too large")
+                return body.getvalue()
+        except ThumbnailError:
+            raise
+        except Exception as e:
+            raise ThumbnailError(str(e))
+
+    def _render(self, data, size, fmt):
+        try:
+            from PIL import Image, ImageOps
+
+            image = ImageOps.exif_transpose(Image.open(io.BytesIO(data)))
+            # Square crop, like the object-fit: cover cells it is shown in
+            image = ImageOps.fit(image, (size, size), Image.LANCZOS)
+            if fmt == 'jpeg' or image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGB')
+            out = io.BytesIO()
+            if fmt == 'webp':
+                image.save(out, 'WEBP', quality=THUMB_QUALITY, method=4)
+            else:
+                image.save(out, 'JPEG', quality=THUMB_QUALITY, optimize=True, progressive=True)
+            return out.getvalue()
+        except Exception as e:
+            raise ThumbnailError(f"cannot decode image: {e}")
+
+    def _account(self, written):
+        with self._lock:
+            self._writes += 1
+            if self._bytes is not None:
+                self._bytes += written
+            if self._bytes is not None and self._bytes <= self.max_bytes and self._writes % RESCAN_EVERY:
+                return
+            self._bytes = self.evict()
+
+    def evict(self):
+        """
+        Deletes least recently used files until the cache is under 90% of its limit. Returns the size left.
+        """
+        entries = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith('.tmp'):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return total
+        entries.sort()
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        return total
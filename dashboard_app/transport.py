@@ -0,0 +1,159 @@
+import os
+import random
+import threading
+from json import dumps as jsonencode
+from time import time
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+from urllib3.util.retry import Retry
+from woocommerce import API
+from woocommerce.oauth import OAuth
+
+try:
+    from dashboard_app.metrics import track_upstream
+    from dashboard_app.resilience import endpoint_label
+except ImportError:
+    from metrics import track_upstream
+    from resilience import endpoint_label
+
+# Transport Configuration
+POOL_SIZE = int(os.environ.get('WC_POOL_SIZE', 16))  # Keep-alive connections per host, per worker process
+MAX_RETRIES = int(os.environ.get('WC_MAX_RETRIES', 3))
+BACKOFF_FACTOR = 0.5  # Exponential backoff base (seconds), with full jitter
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# POST is not retried on a response: the store may already have created the record
+RETRY_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+
+
+class RateLimitedError(Exception):
+    """
+    The client's own rate limit left no room for the call within its timeout.
+    """
+
+
+class JitteredRetry(Retry):
+    """
+    urllib3 Retry with full jitter on the exponential backoff, so parallel
+    clients that failed together don't retry together.
+    """
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        return random.uniform(0, backoff) if backoff else 0
+
+
+def make_session(pool_size=POOL_SIZE, max_retries=MAX_RETRIES, read_retries=None):
+    # read_retries=0: a read timeout fails the call instead of sending it again. Dashboard requests
+    # use it, so a slow store costs one timeout per call; the import scripts keep the full retries.
+    retry = JitteredRetry(
+        total=max_retries,
+        read=read_retries,
+        backoff_factor=BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=RETRY_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    The process-wide pooled session shared by every WooCommerce client.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = make_session()
+        return _session
+
+
+class PooledAPI(API):
+    """
+    woocommerce.API that sends every request through a shared keep-alive
+    session, so TLS handshakes happen once per pooled connection instead of
+    once per call. Accepts a per-call `timeout` on every method.
+    """
+
+    def __init__(self, url, consumer_key, consumer_secret, session=None, rate_limiter=None, **kwargs):
+        super().__init__(url, consumer_key, consumer_secret, **kwargs)
+        self.session = session or get_session()
+        self.rate_limiter = rate_limiter
+
+    def _url(self, endpoint):
+        url = self.url if self.url.endswith('/') else f"{self.url}/"
+        api = "wp-json" if self.wp_api else "wc-api"
+        return f"{url}{api}/{self.version}/{endpoint}"
+
+    def _request(self, method, endpoint, data, params=None, timeout=None, **kwargs):
+        timeout = self.timeout if timeout is None else timeout
+        wait = sum(timeout) if isinstance(timeout, tuple) else timeout  # requests also takes (connect, read)
+        if self.rate_limiter is not None and not self.rate_limiter.acquire(timeout=wait):
+            raise RateLimitedError(f"{endpoint}: store rate limit reached")
+        params = dict(params or {})
+        url = self._url(endpoint)
+        auth = None
+        headers = {
+            "user-agent": self.user_agent,
+            "accept": "application/json",
+        }
+
+        if self.is_ssl and not self.query_string_auth:
+            auth = HTTPBasicAuth(self.consumer_key, self.consumer_secret)
+        elif self.is_ssl:
+            params.update({"consumer_key": self.consumer_key, "consumer_secret": self.consumer_secret})
+        else:
+            url = OAuth(
+                url=f"{url}?{urlencode(params)}",
+                consumer_key=self.consumer_key,
+                consumer_secret=self.consumer_secret,
+                version=self.version,
+                method=method,
+                oauth_timestamp=kwargs.pop("oauth_timestamp", int(time())),
+            ).get_oauth_url()
+            params = {}
+
+        if data is not None:
+            data = jsonencode(data, ensure_ascii=False).encode('utf-8')
+            headers["content-type"] = "application/json;charset=utf-8"
+
+        with track_upstream('woocommerce', endpoint_label(endpoint)) as call:
+            response = self.session.request(
+                method=method,
+                url=url,
+                verify=self.verify_ssl,
+                auth=auth,
+                params=params,
+                data=data,
+                timeout=timeout,
+                headers=headers,
+                **kwargs
+            )
+            call['status'] = response.status_code
+        return response
+
+    def get(self, endpoint, **kwargs):
+        return self._request("GET", endpoint, None, **kwargs)
+
+    def post(self, endpoint, data, **kwargs):
+        return self._request("POST", endpoint, data, **kwargs)
+
+    def put(self, endpoint, data, **kwargs):
+        return self._request("PUT", endpoint, data, **kwargs)
+
+    def delete(self, endpoint, **kwargs):
+        return self._request("DELETE", endpoint, None, **kwargs)
+
+    def options(self, endpoint, **kwargs):
+        return self._request("OPTIONS", endpoint, None, **kwargs)
@@ -0,0 +1,136 @@
+import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Webhook Configuration
+# Must match the "Secret" field of the webhooks created in WooCommerce > Settings > Advanced > Webhooks
+WEBHOOK_SECRET = os.environ.get('WC_WEBHOOK_SECRET', '')
+DELIVERY_DEDUPE_WINDOW = 600  # Seconds a delivery ID is remembered (WooCommerce retries reuse it)
+COLLAPSE_DELAY = 0.5  # Seconds to wait so a burst of events for one record is applied once
+
+# Topic prefix -> mirrored resource
+TOPIC_RESOURCES = {
+    "order": "orders",
+    "product": "products",
+    "customer": "customers",
+    "coupon": "coupons",
+}
+
+# Cache prefixes that also depend on a resource
+DEPENDENT_CACHE_PREFIXES = {
+    "orders": ("reports",),
+}
+
+
+def verify_signature(body, signature, secret=None):
+    """
+    Checks X-WC-Webhook-Signature: base64(HMAC-SHA256(secret, raw body)).
+    """
+    secret = WEBHOOK_SECRET if secret is None else secret
+    if not secret or not signature:
+        return False
+    expected = base64.b64encode(hmac.new(secret.encode('utf-8'), body, hashlib.sha256).digest()).decode('ascii')
+    return hmac.compare_digest(expected, signature)
+
+
+def parse_topic(topic):
+    """
+    "order.updated" -> ("orders", "updated"); unknown topics -> (None, None).
+    """
+    prefix, _, action = (topic or '').partition('.')
+    resource = TOPIC_RESOURCES.get(prefix)
+    if resource is None or not action:
+        return None, None
+    return resource, action
+
+
+class WebhookProcessor:
+    """
+    Applies webhook events to the mirror and the read cache off the request path.
+
+    Events are queued per record, so a burst of deliveries for the same order
+    or product collapses into one write of the latest payload. Deliveries that
+    WooCommerce retries (same delivery ID) are dropped.
+    """
+
+    def __init__(self, mirror, cache):
+        self.mirror = mirror
+        self.cache = cache
+        self._pending = OrderedDict()  # (resource, id) -> (action, payload)
+        self._deliveries = OrderedDict()  # delivery ID -> time seen
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, topic, payload, delivery_id=None):
+        """
+        Queues an event. Returns False if it was ignored (unknown topic or duplicate delivery).
+        """
+        resource, action = parse_topic(topic)
+        if resource is None or not isinstance(payload, dict) or 'id' not in payload:
+            return False
+
+        with self._cond:
+            if delivery_id:
+                self._forget_old_deliveries()
+                if delivery_id in self._deliveries:
+                    return False
+                self._deliveries[delivery_id] = time.time()
+
+            key = (resource, payload['id'])
+            self._pending.pop(key, None)
+            self._pending[key] = (action, payload)
+            self._ensure_worker()
+            self._cond.notify()
+        return True
+
+    def _forget_old_deliveries(self):
+        cutoff = time.time() - DELIVERY_DEDUPE_WINDOW
+        while self._deliveries:
+            delivery_id, seen = next(iter(self._deliveries.items()))
+            if seen >= cutoff:
+                break
+            del self._deliveries[delivery_id]
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='webhook-processor', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+            # Let the rest of a burst arrive before draining
+            time.sleep(COLLAPSE_DELAY)
+            with self._cond:
+                batch = list(self._pending.items())
+                self._pending.clear()
+
+            touched = set()
+            for (resource, record_id), (action, payload) in batch:
+                try:
+                    self.apply(resource, action, payload)
+                    touched.add(resource)
+                except Exception as e:
+                    print(f"Webhook apply error ({resource} {record_id}): {e}")
+
+            for resource in touched:
+                self.cache.invalidate(resource)
+                for prefix in DEPENDENT_CACHE_PREFIXES.get(resource, ()):
+                    self.cache.invalidate(prefix)
+
+    def apply(self, resource, action, payload):
+        if action == 'deleted':
+            self.mirror.delete(resource, payload['id'])
+            return
+
+        # Ignore payloads older than what the mirror already holds (out-of-order retries)
+        current = self.mirror.get(resource, payload['id'])
+        if current and (current.get('date_modified_gmt') or '') > (payload.get('date_modified_gmt') or ''):
+            return
+        self.mirror.upsert(resource, payload)
@@ -0,0 +1,24 @@
+import os
+
+# gunicorn reads this file automatically when started from the repository root.
+#
+# SERVER_MODE selects how a worker serves concurrent requests:
+#   threads (default)  gthread workers; every request holds a thread while it waits on WooCommerce/Google
+#   gevent             gevent workers; one event loop per worker and a greenlet per request, with the
+#                      standard library patched so the WooCommerce and Google clients yield while
+#                      they wait on the network. Hundreds of open dashboards fit in one worker.
+SERVER_MODE = os.environ.get('SERVER_MODE', 'threads')
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+
+if SERVER_MODE == 'gevent':
+    worker_class = 'gevent'
+    worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 1000))  # Concurrent requests per worker
+    # More requests in flight per worker, so keep more keep-alive connections to the store
+    os.environ.setdefault('WC_POOL_SIZE', '64')
+elif SERVER_MODE == 'threads':
+    worker_class = 'gthread'
+    threads = int(os.environ.get('GUNICORN_THREADS', 16))
+else:
+    raise ValueError(f"SERVER_MODE must be 'threads' or 'gevent', not {SERVER_MODE!r}")
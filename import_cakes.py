@@ -1,6 +1,6 @@
 import json
 import time
-from woocommerce import API
+from dashboard_app.transport import PooledAPI
 import os
 
 # WooCommerce API Credentials
@@ -8,7 +8,7 @@ WC_URL = "https://mahmoudbey-oc.com/"
 WC_CK = "ck_689a9851ae9c92e0afd89199a4b30eec1ab36c0b"
 WC_CS = "cs_935a014aa1f232581dc4ae2e0849d66bbc3e52ac"
 
-wcapi = API(
+wcapi = PooledAPI(
     url=WC_URL,
     consumer_key=WC_CK,
     consumer_secret=WC_CS,
@@ -2,7 +2,7 @@ import json
 from scrape_omaya import import_to_woocommerce
 # Reuse existing WooCommerce credentials from import_cakes to avoid duplication
 from import_cakes import WC_URL as WP_URL, WC_CK as CONSUMER_KEY, WC_CS as CONSUMER_SECRET
-from woocommerce import API
+from dashboard_app.transport import PooledAPI
 CAT_NAME = "Omaya Products"
 QUIET = True
 
@@ -11,7 +11,7 @@ def load_products(filename="products.json"):
         return json.load(f)
 
 def verify_category_upload(expected_products, cat_name):
-    wcapi = API(url=WP_URL, consumer_key=CONSUMER_KEY, consumer_secret=CONSUMER_SECRET, version="wc/v3", timeout=20)
+    wcapi = PooledAPI(url=WP_URL, consumer_key=CONSUMER_KEY, consumer_secret=CONSUMER_SECRET, version="wc/v3", timeout=20)
     # Find category ID by name
     category_id = 0
     resp = wcapi.get("products/categories")
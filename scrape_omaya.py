@@ -3,11 +3,14 @@ from bs4 import BeautifulSoup
 import json
 import os
 import csv
+import hashlib
+import sqlite3
+import threading
 from urllib.parse import urljoin, urlparse
 
 # Try importing WooCommerce, if not available, we'll skip that part or warn
 try:
-    from woocommerce import API
+    from dashboard_app.transport import PooledAPI
     WOOCOMMERCE_AVAILABLE = True
 except ImportError:
     WOOCOMMERCE_AVAILABLE = False
@@ -18,103 +21,266 @@ IMAGE_DIR = "downloaded_images"
 VERBOSE = False
 GENERATE_CSV = False
 
-def scrape_products():
-    all_products = []
-    seen_urls = set()
-    page = 1
-    
-    while True:
-        # Construct URL for pagination
-        # Based on user input ".../5/Ar/1", we assume path-based pagination: /1, /2, etc.
-        url = f"{TARGET_URL}/{page}"
-        if VERBOSE:
-            print(f"Fetching {url}...")
+# Crawl Configuration
+LISTING_WORKERS = int(os.environ.get('SCRAPE_LISTING_WORKERS', 4))  # Listing pages fetched at once
+ENRICH_WORKERS = int(os.environ.get('SCRAPE_ENRICH_WORKERS', 8))  # Detail pages fetched at once
+REQUEST_TIMEOUT = 15
+HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+# Page Cache Configuration
+# Listing and detail pages are stored with their ETag/Last-Modified and parsed result. Re-runs
+# revalidate them with conditional GETs and reuse the parsed result when a page has not changed.
+# Set SCRAPE_CACHE_PATH to an empty value to always download and parse everything.
+SCRAPE_CACHE_PATH = os.environ.get('SCRAPE_CACHE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.scrape_cache.sqlite3'))
+PARSER_VERSION = "1"  # Bump when parse_listing/parse_detail change, so cached pages are parsed again
+
+_session = None
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+def get_session():
+    """
+    Keep-alive session shared by the listing and detail workers.
+    """
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.headers.update(HEADERS)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=LISTING_WORKERS + ENRICH_WORKERS)
+        _session.mount('http://', adapter)
+        _session.mount('https://', adapter)
+    return _session
+
+class PageCache:
+    """
+    SQLite store of fetched pages: validators, a digest of the body and the parsed result.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.stats = {"not_modified": 0, "unchanged": 0, "fetched": 0}
+        self._conn().execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                digest TEXT,
+                parser TEXT,
+                parsed TEXT,
+                fetched REAL
+            )
+        """)
+
+    def _conn(self):
+        # One connection per thread; the listing and detail workers all read and write
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, url):
+        row = self._conn().execute(
+            "SELECT etag, last_modified, digest, parsed FROM pages WHERE url = ? AND parser = ?",
+            (url, PARSER_VERSION),
+        ).fetchone()
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "digest": row[2], "parsed": row[3]}
+
+    def put(self, url, etag, last_modified, digest, parsed):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO pages (url, etag, last_modified, digest, parser, parsed, fetched) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, etag, last_modified, digest, PARSER_VERSION, parsed, time.time()),
+        )
+
+    def count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+def get_page_cache():
+    global _page_cache
+    if not SCRAPE_CACHE_PATH:
+        return None
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache(SCRAPE_CACHE_PATH)
+    return _page_cache
+
+def fetch_page(url, parse):
+    """
+    parse(body) for the page at url; raises requests.HTTPError unless it answers 200.
+
+    With the page cache the GET is conditional: a 304 returns the stored
+    result without downloading or parsing the page, and a 200 with the same
+    body as last time (no validators) reuses it without parsing.
+    """
+    cache = get_page_cache()
+    entry = cache.get(url) if cache else None
+    headers = {}
+    if entry and entry['etag']:
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry['last_modified']:
+        headers['If-Modified-Since'] = entry['last_modified']
+
+    response = get_session().get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 304 and entry:
+        cache.count("not_modified")
+        return json.loads(entry['parsed'])
+    if response.status_code != 200:
+        raise requests.HTTPError(f"{response.status_code} for {url}", response=response)
+    if cache is None:
+        return parse(response.content)
+
+    digest = hashlib.sha256(response.content).hexdigest()
+    if entry and entry['digest'] == digest:
+        cache.count("unchanged")
+        parsed = json.loads(entry['parsed'])
+    else:
+        cache.count("fetched")
+        parsed = parse(response.content)
+    cache.put(url, response.headers.get('ETag'), response.headers.get('Last-Modified'), digest,
+              json.dumps(parsed, ensure_ascii=False))
+    return parsed
+
+def parse_listing(content):
+    """
+    Products on one listing page, in page order.
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    products = []
+    for block in soup.find_all('div', class_='block-stl2'):
         try:
-            response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'})
-            response.raise_for_status()
-        except requests.RequestException as e:
-            print(f"Failed to fetch page {page}: {e}")
-            break
+            # Extract Name
+            name_tag = block.find('div', class_='text-block').find('h3')
+            name = name_tag.get_text(strip=True) if name_tag else "Unknown Product"
 
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find all product blocks
-        product_blocks = soup.find_all('div', class_='block-stl2')
-        if not product_blocks:
-            if VERBOSE:
-                print("No products found on this page. Stopping.")
-            break
-            
-        if VERBOSE:
-            print(f"Found {len(product_blocks)} products on page {page}.")
-        
-        products_on_page = []
-        for block in product_blocks:
-            try:
-                # Extract Name
-                name_tag = block.find('div', class_='text-block').find('h3')
-                name = name_tag.get_text(strip=True) if name_tag else "Unknown Product"
-                
-                # Extract Price
-                price_tag = block.find('p', class_='price').find('span')
-                price_text = price_tag.get_text(strip=True) if price_tag else "0"
-                
-                # Extract Product Link (for uniqueness)
-                link_tag = block.find('div', class_='btn-sec').find('a', class_='btn4')
-                product_link = link_tag.get('href') if link_tag else ""
-                
-                # Extract Image
-                img_tag = block.find('div', class_='img-holder').find('img')
-                img_src = img_tag.get('src') if img_tag else ""
-                
-                # Fix Image URL
-                if img_src.startswith('.'):
-                    img_src = img_src[1:] # remove the dot
-                
-                if img_src and not img_src.startswith('http'):
-                    full_img_url = urljoin(BASE_URL, img_src)
-                else:
-                    full_img_url = img_src
-                    
-                product = {
-                    "name": name,
-                    "price": price_text,
-                    "image_url": full_img_url,
-                    "original_image_path": img_src,
-                    "product_link": product_link
-                }
-                
+            # Extract Price
+            price_tag = block.find('p', class_='price').find('span')
+            price_text = price_tag.get_text(strip=True) if price_tag else "0"
+
+            # Extract Product Link (for uniqueness)
+            link_tag = block.find('div', class_='btn-sec').find('a', class_='btn4')
+            product_link = link_tag.get('href') if link_tag else ""
+
+            # Extract Image
+            img_tag = block.find('div', class_='img-holder').find('img')
+            img_src = img_tag.get('src') if img_tag else ""
+
+            # Fix Image URL
+            if img_src.startswith('.'):
+                img_src = img_src[1:] # remove the dot
+
+            if img_src and not img_src.startswith('http'):
+                full_img_url = urljoin(BASE_URL, img_src)
+            else:
+                full_img_url = img_src
+
+            products.append({
+                "name": name,
+                "price": price_text,
+                "image_url": full_img_url,
+                "original_image_path": img_src,
+                "product_link": product_link
+            })
+        except AttributeError as e:
+            print(f"Error parsing a block: {e}")
+            continue
+    return products
+
+def fetch_listing_page(page):
+    """
+    Products on listing page `page`, or None if it could not be fetched.
+    """
+    # Based on user input ".../5/Ar/1", we assume path-based pagination: /1, /2, etc.
+    url = f"{TARGET_URL}/{page}"
+    if VERBOSE:
+        print(f"Fetching {url}...")
+    try:
+        return fetch_page(url, parse_listing)
+    except requests.RequestException as e:
+        print(f"Failed to fetch page {page}: {e}")
+        return None
+
+def crawl(enrich=True, listing_workers=None, enrich_workers=None):
+    """
+    Scrapes every listing page and (optionally) every product's detail page as one pipeline.
+
+    Up to `listing_workers` listing pages are in flight at once. Pages are
+    handled in order, so de-duplication and the stopping rule (first page
+    that fails, is empty or has only already-seen products) are the same as
+    walking them one by one; pages fetched past that point are discarded.
+    Each new product is queued for enrichment as soon as its page is
+    handled, so detail pages load while later listing pages are still coming in.
+    """
+    listing_workers = listing_workers or LISTING_WORKERS
+    enrich_workers = enrich_workers or ENRICH_WORKERS
+    seen_urls = set()
+    products = []
+    enriched = []
+
+    listing_pool = concurrent.futures.ThreadPoolExecutor(max_workers=listing_workers)
+    enrich_pool = concurrent.futures.ThreadPoolExecutor(max_workers=enrich_workers)
+    try:
+        pages = {page: listing_pool.submit(fetch_listing_page, page) for page in range(1, listing_workers + 1)}
+        page = 1
+        while True:
+            page_products = pages.pop(page).result()
+            if not page_products:
+                if VERBOSE:
+                    print(f"No products found on page {page}. Stopping.")
+                break
+
+            new_products = []
+            for product in page_products:
                 # Check for duplicates based on Product Link (or Name if link missing)
-                unique_key = product_link if product_link else name
+                unique_key = product['product_link'] if product['product_link'] else product['name']
                 if unique_key in seen_urls:
                     continue
-                    
                 seen_urls.add(unique_key)
-                products_on_page.append(product)
-                # print(f"Scraped: {name} - {price_text}")
-                
-            except AttributeError as e:
-                print(f"Error parsing a block: {e}")
-                continue
-
-        if not products_on_page:
+                new_products.append(product)
+
+            if not new_products:
+                if VERBOSE:
+                    print("No new products found (all duplicates). Stopping.")
+                break
             if VERBOSE:
-                print("No new products found (all duplicates). Stopping.")
-            break
-            
-        all_products.extend(products_on_page)
-        if VERBOSE:
-            print(f"Added {len(products_on_page)} new products from page {page}.")
-        
-        # Stop if we found fewer products than expected for a full page (assuming ~16 is full)
-        # or just increment and let the duplicate check handle it.
-        # But to be safe against infinite loops if the site returns random products:
-        if len(products_on_page) == 0:
-            break
-            
-        page += 1
+                print(f"Added {len(new_products)} new products from page {page}.")
+
+            for product in new_products:
+                if enrich:
+                    enriched.append(enrich_pool.submit(enrich_single_product, (len(products), product)))
+                products.append(product)
+
+            # Keep the window full: one more listing page for the one just handled
+            pages[page + listing_workers] = listing_pool.submit(fetch_listing_page, page + listing_workers)
+            page += 1
+
+        for future in pages.values():
+            future.cancel()
+        if enrich:
+            if VERBOSE:
+                print(f"Waiting for {len(enriched)} detail pages")
+            products = [future.result() for future in enriched]
+    finally:
+        listing_pool.shutdown(wait=False)
+        enrich_pool.shutdown(wait=True)
 
-    return all_products
+    cache = get_page_cache()
+    if cache and VERBOSE:
+        print(f"Page cache: {cache.stats['not_modified']} not modified, {cache.stats['unchanged']} unchanged, "
+              f"{cache.stats['fetched']} downloaded and parsed")
+
+    if enrich:
+        products = dynamic_enrich_missing(products)
+    return products
+
+def scrape_products():
+    return crawl(enrich=False)
 
 import time
 import sys
@@ -140,6 +306,22 @@ def build_driver():
     service = Service(ChromeDriverManager().install())
     return webdriver.Chrome(service=service, options=opts)
 
+def parse_detail(content):
+    """
+    What enrichment uses from a product page: the large image path, og:title, <title> and price text.
+    """
+    soup = BeautifulSoup(content, 'html.parser')
+    large_img = soup.find('img', src=lambda x: x and 'larg' in x)
+    og_title = soup.find('meta', property='og:title')
+    price_tag = soup.find(class_='price')
+    price_span = price_tag.find('span') if price_tag else None
+    return {
+        "large_src": large_img.get('src') if large_img else None,
+        "og_title": og_title.get('content') if og_title else None,
+        "page_title": str(soup.title.string) if soup.title and soup.title.string else "",
+        "price": price_span.get_text(strip=True) if price_span else None,
+    }
+
 def enrich_single_product(args):
     i, p = args
     link = p.get('product_link')
@@ -151,17 +333,15 @@ def enrich_single_product(args):
         print(f"[{i+1}] Visiting {full_link}...")
     
     try:
-        response = requests.get(full_link, headers={'User-Agent': 'Mozilla/5.0'}, timeout=15)
-        if response.status_code != 200:
-            print(f"Failed to load detail page: {response.status_code}")
+        try:
+            details = fetch_page(full_link, parse_detail)
+        except requests.HTTPError as e:
+            print(f"Failed to load detail page: {e.response.status_code}")
             return p
-            
-        soup = BeautifulSoup(response.content, 'html.parser')
         
         # 1. Try to find High-Res Image (folder 'larg')
-        large_img = soup.find('img', src=lambda x: x and 'larg' in x)
-        if large_img:
-            large_src = large_img.get('src')
+        large_src = details['large_src']
+        if large_src:
             if large_src.startswith('.'):
                 large_src = large_src[1:]
             
@@ -172,21 +352,16 @@ def enrich_single_product(args):
 
         # 2. Try to find Name if missing
         if not p['name'] or p['name'] == "Unknown Product":
-            og_title = soup.find('meta', property='og:title')
-            if og_title and og_title.get('content'):
-                p['name'] = og_title.get('content').strip()
+            if details['og_title']:
+                p['name'] = details['og_title'].strip()
             else:
-                page_title = soup.title.string if soup.title else ""
+                page_title = details['page_title']
                 if page_title and "|" in page_title:
                     p['name'] = page_title.split('|')[0].strip()
 
         # 3. Try to find Price if missing
-        if not p['price'] or p['price'] == "0":
-            price_tag = soup.find(class_='price')
-            if price_tag:
-                price_span = price_tag.find('span')
-                if price_span:
-                    p['price'] = price_span.get_text(strip=True)
+        if (not p['price'] or p['price'] == "0") and details['price'] is not None:
+            p['price'] = details['price']
 
         # Final Fallback
         if not p['name'] or p['name'] == "Unknown Product":
@@ -270,17 +445,24 @@ def enrich_products(products):
     if VERBOSE:
         print(f"Enriching {len(products)} products with details")
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
+    with concurrent.futures.ThreadPoolExecutor(max_workers=ENRICH_WORKERS) as executor:
         # Pass index and product as tuple
         args_list = [(i, p) for i, p in enumerate(products)]
         results = list(executor.map(enrich_single_product, args_list))
-    if SELENIUM_AVAILABLE:
+    return dynamic_enrich_missing(results)
+
+def dynamic_enrich_missing(results):
+    """
+    Renders (with Selenium, when installed) the detail pages that still lack a name or price.
+    """
+    missing = [i for i, p in enumerate(results)
+               if (not p.get("name") or p["name"] == "Unknown Product") or (not p.get("price") or p["price"] == "0")]
+    if SELENIUM_AVAILABLE and missing:
+        driver = None
         try:
             driver = build_driver()
-            for i in range(len(results)):
-                p = results[i]
-                if (not p.get("name") or p["name"] == "Unknown Product") or (not p.get("price") or p["price"] == "0"):
-                    results[i] = dynamic_enrich_product(p, driver)
+            for i in missing:
+                results[i] = dynamic_enrich_product(results[i], driver)
         finally:
             try:
                 driver.quit()
@@ -342,7 +524,7 @@ def import_to_woocommerce(products, url, consumer_key, consumer_secret, cat_name
         print("WooCommerce library not installed. Please install it.")
         return
 
-    wcapi = API(
+    wcapi = PooledAPI(
         url=url,
         consumer_key=consumer_key,
         consumer_secret=consumer_secret,
@@ -483,10 +665,8 @@ def import_to_woocommerce(products, url, consumer_key, consumer_secret, cat_name
 
 if __name__ == "__main__":
     try:
-        products = scrape_products()
-        
-        # Enrich with details from product pages
-        products = enrich_products(products)
+        # Listing pages and product detail pages are fetched as one pipeline
+        products = crawl()
         
         save_to_json(products)
         if GENERATE_CSV:
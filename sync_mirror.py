@@ -0,0 +1,13 @@
+import sys
+from dashboard_app.app import wcapi, mirror
+
+# Usage: python sync_mirror.py [--full]
+# Runs one mirror sync outside the web process (e.g. from cron or a Render job).
+
+if __name__ == "__main__":
+    full = '--full' in sys.argv
+    results = mirror.sync_all(wcapi, full=full)
+    for resource, written in results.items():
+        state = mirror.get_state(resource)
+        written_text = "FAILED" if written is None else f"{written} records"
+        print(f"{resource}: {written_text} (high-water: {state['high_water']})")